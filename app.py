@@ -54,12 +54,19 @@ DEFAULT_CONFIG = {
     "color_on_dark": [0, 255, 0],
     "color_on_light": [255, 0, 255],
     "luma_threshold": 128,
+    "color_granularity": "pixel",  # "pixel" | "block" | "arm": area one Adaptive decision averages
+    "granularity_block": 8,
     "static_color": [0, 255, 0],
     "offset_x": 0,
     "offset_y": 0,
     "refresh_ms": 7,
+    "refresh_mode": "fixed",     # "fixed" = always refresh_ms, "auto" = idle down when nothing moves
+    "idle_hz": 10,
+    "pipelined": False,          # capture the next frame on a worker thread while this one renders
     "opacity": 255,
     "show_in_capture": False,
+    "sample_radius": 4,          # show_in_capture: px searched for clean background
+    "layers": [],                # composite reticle (edit the file): per-layer overrides, bottom first
     "position_mode": "center",   # "center" = screen center + offset, "manual" = absolute
     "manual_x": 960,
     "manual_y": 540,
@@ -530,6 +537,10 @@ class CrosshairApp:
         self._status_lbl = tk.Label(title_bar, text="OFF", bg=BG, fg=FG_DIM, font=FONT_SM)
         self._status_lbl.pack(side="left", padx=(4, 0))
 
+        # Live achieved FPS / frame cost while running
+        self._stats_lbl = tk.Label(title_bar, text="", bg=BG, fg=FG_DIM, font=FONT_SM)
+        self._stats_lbl.pack(side="left", padx=(8, 0))
+
         self.btn_toggle = FlatButton(title_bar, text="START", command=self._toggle,
                                       bg=ACCENT, hover_bg=ACCENT_HOVER, width=80, height=30)
         self.btn_toggle.pack(side="right")
@@ -600,6 +611,20 @@ class CrosshairApp:
                                    lambda v: self._on_any_change())
         self._sl_luma.pack(fill="x")
 
+        self.granularity_var = tk.StringVar()
+        self._granularity_seg = SegmentedControl(card, ["pixel", "block", "arm"],
+                                                 self.granularity_var, self._on_granularity_change)
+        self._granularity_seg.pack(padx=12, pady=(6, 2))
+
+        # --- Block granularity: size of the averaged square ---
+        self._block_frame = tk.Frame(card, bg=BG_CARD)
+        # Not packed yet — shown/hidden by _on_granularity_change
+
+        self.block_var = tk.IntVar()
+        self._sl_block = SliderRow(self._block_frame, "Block Size", 2, 32, self.block_var,
+                                    lambda v: self._on_any_change())
+        self._sl_block.pack(fill="x")
+
         self.opacity_var = tk.IntVar()
         self._sl_opacity = SliderRow(card, "Opacity", 10, 255, self.opacity_var,
                                       lambda v: self._on_any_change())
@@ -656,11 +681,36 @@ class CrosshairApp:
         # ── Performance section ──
         SectionHeader(card, "Performance").pack(fill="x")
 
+        self.refresh_mode_var = tk.StringVar()
+        self._refresh_mode_seg = SegmentedControl(card, ["fixed", "auto"],
+                                                  self.refresh_mode_var, self._on_refresh_mode_change)
+        self._refresh_mode_seg.pack(padx=12, pady=(6, 2))
+
         self.refresh_var = tk.IntVar()
         self._sl_refresh = SliderRow(card, "Refresh (ms)", 1, 100, self.refresh_var,
                                       lambda v: self._on_any_change())
         self._sl_refresh.pack(fill="x")
 
+        # --- Auto mode: slowest rate used while the background is static ---
+        self._auto_frame = tk.Frame(card, bg=BG_CARD)
+        # Not packed yet — shown/hidden by _on_refresh_mode_change
+
+        self.idle_hz_var = tk.IntVar()
+        self._sl_idle_hz = SliderRow(self._auto_frame, "Idle Rate (Hz)", 1, 60, self.idle_hz_var,
+                                      lambda v: self._on_any_change())
+        self._sl_idle_hz.pack(fill="x")
+
+        pipe_row = tk.Frame(card, bg=BG_CARD)
+        pipe_row.pack(fill="x", padx=12, pady=(4, 0))
+        tk.Label(pipe_row, text="Pipelined Capture", bg=BG_CARD, fg=FG_DIM,
+                 font=FONT_LBL, anchor="w").pack(side="left")
+        self.pipelined_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            pipe_row, variable=self.pipelined_var, command=self._on_any_change,
+            bg=BG_CARD, fg=FG, selectcolor=BG_INPUT, activebackground=BG_CARD,
+            activeforeground=FG, highlightthickness=0, bd=0, cursor="hand2",
+        ).pack(side="right")
+
         # ── Recording toggle ──
         rec_row = tk.Frame(card, bg=BG_CARD)
         rec_row.pack(fill="x", padx=12, pady=(8, 4))
@@ -668,14 +718,24 @@ class CrosshairApp:
                  font=FONT_LBL, anchor="w").pack(side="left")
         self.capture_var = tk.BooleanVar(value=False)
         self._rec_toggle = tk.Checkbutton(
-            rec_row, variable=self.capture_var, command=self._on_any_change,
+            rec_row, variable=self.capture_var, command=self._on_capture_toggle,
             bg=BG_CARD, fg=FG, selectcolor=BG_INPUT, activebackground=BG_CARD,
             activeforeground=FG, highlightthickness=0, bd=0, cursor="hand2",
         )
         self._rec_toggle.pack(side="right")
+        self._rec_row = rec_row
+
+        # --- Shown while visible in recordings ---
+        self._radius_frame = tk.Frame(card, bg=BG_CARD)
+        # Not packed yet — shown/hidden by _on_capture_toggle
 
-        rec_note = tk.Label(card, text="This feature may cause some weird artifacts on the crosshair,\n"
-                                        "and is recommended to be used only with a thickness of 1 pixel.",
+        self.radius_var = tk.IntVar()
+        self._sl_radius = SliderRow(self._radius_frame, "Sample Radius", 1, 10, self.radius_var,
+                                     lambda v: self._on_any_change())
+        self._sl_radius.pack(fill="x")
+
+        rec_note = tk.Label(card, text="The crosshair samples the background up to Sample Radius pixels\n"
+                                        "away; raise it if thick shapes show artifacts.",
                             bg=BG_CARD, fg="#555555", font=("Segoe UI", 7), anchor="w", justify="left")
         rec_note.pack(fill="x", padx=16, pady=(0, 4))
 
@@ -705,11 +765,17 @@ class CrosshairApp:
         self._sl_gap.set(c["gap"])
         self.cmode_var.set(c["color_mode"])
         self._sl_luma.set(c["luma_threshold"])
+        self._granularity_seg.set(c.get("color_granularity", "pixel"))
+        self._sl_block.set(c.get("granularity_block", 8))
         self._sl_opacity.set(c["opacity"])
         self._sl_offx.set(c["offset_x"])
         self._sl_offy.set(c["offset_y"])
         self._sl_refresh.set(c["refresh_ms"])
+        self._refresh_mode_seg.set(c.get("refresh_mode", "fixed"))
+        self._sl_idle_hz.set(c.get("idle_hz", 10))
+        self.pipelined_var.set(c.get("pipelined", False))
         self.capture_var.set(c.get("show_in_capture", False))
+        self._sl_radius.set(c.get("sample_radius", 4))
         self._cr_dark.set_color(c["color_on_dark"])
         self._cr_light.set_color(c["color_on_light"])
         self._cr_static.set_color(c["static_color"])
@@ -717,6 +783,9 @@ class CrosshairApp:
         self._sl_manual_x.set(c.get("manual_x", 960))
         self._sl_manual_y.set(c.get("manual_y", 540))
         self._on_posmode_change(c.get("position_mode", "center"))
+        self._on_refresh_mode_change(c.get("refresh_mode", "fixed"))
+        self._on_granularity_change(c.get("color_granularity", "pixel"))
+        self._on_capture_toggle()
 
     def _read_ui(self):
         self.cfg["shape"] = self.shape_var.get()
@@ -725,11 +794,17 @@ class CrosshairApp:
         self.cfg["gap"] = self.gap_var.get()
         self.cfg["color_mode"] = self.cmode_var.get()
         self.cfg["luma_threshold"] = self.luma_var.get()
+        self.cfg["color_granularity"] = self.granularity_var.get()
+        self.cfg["granularity_block"] = self.block_var.get()
         self.cfg["opacity"] = self.opacity_var.get()
         self.cfg["offset_x"] = self.offx_var.get()
         self.cfg["offset_y"] = self.offy_var.get()
         self.cfg["refresh_ms"] = self.refresh_var.get()
+        self.cfg["refresh_mode"] = self.refresh_mode_var.get()
+        self.cfg["idle_hz"] = self.idle_hz_var.get()
+        self.cfg["pipelined"] = self.pipelined_var.get()
         self.cfg["show_in_capture"] = self.capture_var.get()
+        self.cfg["sample_radius"] = self.radius_var.get()
         self.cfg["color_on_dark"] = self._cr_dark.get_color()
         self.cfg["color_on_light"] = self._cr_light.get_color()
         self.cfg["static_color"] = self._cr_static.get_color()
@@ -768,6 +843,27 @@ class CrosshairApp:
             self._center_frame.pack(fill="x")
         self._on_any_change()
 
+    def _on_refresh_mode_change(self, val):
+        if val == "auto":
+            self._auto_frame.pack(fill="x", after=self._sl_refresh)
+        else:
+            self._auto_frame.pack_forget()
+        self._on_any_change()
+
+    def _on_granularity_change(self, val):
+        if val == "block":
+            self._block_frame.pack(fill="x", after=self._granularity_seg)
+        else:
+            self._block_frame.pack_forget()
+        self._on_any_change()
+
+    def _on_capture_toggle(self):
+        if self.capture_var.get():
+            self._radius_frame.pack(fill="x", after=self._rec_row)
+        else:
+            self._radius_frame.pack_forget()
+        self._on_any_change()
+
     def _pick_screen_pos(self):
         """Let the user click anywhere on screen to set crosshair position."""
         # Create a transparent fullscreen window to capture a click
@@ -804,12 +900,19 @@ class CrosshairApp:
                 color_on_dark=tuple(self.cfg["color_on_dark"]),
                 color_on_light=tuple(self.cfg["color_on_light"]),
                 luma_threshold=self.cfg["luma_threshold"],
+                color_granularity=self.cfg["color_granularity"],
+                granularity_block=self.cfg["granularity_block"],
                 static_color=tuple(self.cfg["static_color"]),
                 offset_x=self.cfg["offset_x"],
                 offset_y=self.cfg["offset_y"],
                 opacity=self.cfg["opacity"],
                 refresh_ms=self.cfg["refresh_ms"],
+                refresh_mode=self.cfg["refresh_mode"],
+                idle_hz=self.cfg["idle_hz"],
+                pipelined=self.cfg["pipelined"],
                 show_in_capture=self.cfg["show_in_capture"],
+                sample_radius=self.cfg["sample_radius"],
+                layers=self.cfg.get("layers", []),
                 position_mode=self.cfg["position_mode"],
                 manual_x=self.cfg["manual_x"],
                 manual_y=self.cfg["manual_y"],
@@ -822,6 +925,10 @@ class CrosshairApp:
             self.btn_toggle.set_colors(ACCENT, ACCENT_HOVER)
             self._status_canvas.itemconfig(self._status_dot, fill=DANGER)
             self._status_lbl.config(text="OFF", fg=FG_DIM)
+            if getattr(self, "_stats_after_id", None):
+                self.root.after_cancel(self._stats_after_id)
+                self._stats_after_id = None
+            self._stats_lbl.config(text="")
         else:
             self._read_ui()
             self.overlay.config.update({
@@ -833,6 +940,24 @@ class CrosshairApp:
             self.btn_toggle.set_colors(DANGER, DANGER_HOVER)
             self._status_canvas.itemconfig(self._status_dot, fill=SUCCESS)
             self._status_lbl.config(text="ACTIVE", fg=SUCCESS)
+            self._poll_stats()
+
+    def _poll_stats(self):
+        """Refresh the FPS / frame cost readout twice a second while running."""
+        self._stats_after_id = None
+        if not self.overlay.is_running:
+            self._stats_lbl.config(text="")
+            return
+        st = self.overlay.stats()
+        cost = st.get("frame_cost")
+        if st.get("idle"):
+            self._stats_lbl.config(text="idle  ·  static color")
+        elif cost and st.get("pipeline"):
+            self._stats_lbl.config(text=f"{st['fps']:.0f} fps  ·  {cost['p50_ms']:.2f} ms  ·  "
+                                        f"{st['latency']['p50_ms']:.1f} ms latency")
+        elif cost:
+            self._stats_lbl.config(text=f"{st['fps']:.0f} fps  ·  {cost['p50_ms']:.2f} ms")
+        self._stats_after_id = self.root.after(500, self._poll_stats)
 
     def _auto_save(self):
         """Debounced auto-save: saves config 500ms after last change."""
@@ -0,0 +1,259 @@
+"""
+Headless benchmark for the crosshair render pipeline.
+
+Times the mask builders, every COLOR_MODES function, the full per-frame
+recolor over synthetic captured frames and the cost of following a moving
+position, across a matrix of sizes, thicknesses, shapes, opacity and
+show_in_capture. Runs anywhere (no
+display, no Win32) and prints machine-readable JSON:
+
+    python -m crosshair_bench                 # full matrix
+    python -m crosshair_bench --quick -o out.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from crosshair_render import (
+    COLOR_MODES, RenderPlan, RenderState, render_frame, get_color_lut,
+    build_cross_mask, build_dot_mask, build_circle_mask, np,
+)
+from crosshair_surface import MemoryBackend, SurfacePool
+from crosshair_timing import percentile, PositionFeed
+
+
+SIZES = (15, 31, 61, 101, 201, 501)
+THICKNESSES = (1, 3, 9)
+SHAPES = ("cross", "dot", "circle")
+OPACITIES = (255, 128)
+
+QUICK_SIZES = (15, 61, 201)
+QUICK_THICKNESSES = (1, 3)
+
+BASE_CONFIG = {
+    "color_on_dark": (0, 255, 0),
+    "color_on_light": (255, 0, 255),
+    "luma_threshold": 128,
+    "static_color": (0, 255, 0),
+}
+
+
+def summarize(samples_s):
+    ms = [s * 1000.0 for s in samples_s]
+    return {
+        "samples": len(ms),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "mean_ms": round(sum(ms) / len(ms), 4),
+    }
+
+
+def time_calls(fn, iterations, budget_s):
+    """Call ``fn`` up to ``iterations`` times (at least 3, within budget)."""
+    samples = []
+    clock = time.perf_counter
+    deadline = clock() + budget_s
+    while len(samples) < iterations and (len(samples) < 3 or clock() < deadline):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    return samples
+
+
+def build_mask(shape, sz, thick, gap):
+    if shape == "dot":
+        return build_dot_mask(sz, thick)
+    if shape == "circle":
+        return build_circle_mask(sz, thick)
+    return build_cross_mask(sz, thick, gap)
+
+
+def synthetic_frames(sz, count, seed):
+    """Noise frames standing in for captured screen regions."""
+    rnd = random.Random(seed)
+    return [rnd.randbytes(sz * sz * 4) for _ in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_masks(sizes, thicknesses, iterations, budget_s):
+    results = []
+    for shape in SHAPES:
+        for sz in sizes:
+            for thick in thicknesses:
+                samples = time_calls(lambda: build_mask(shape, sz, thick, 2), iterations, budget_s)
+                results.append(dict(bench="mask", shape=shape, size=sz, thickness=thick,
+                                    **summarize(samples)))
+    return results
+
+
+def bench_color_modes(iterations, budget_s, batch=4096):
+    """Per-call cost of each color function over a batch of random pixels."""
+    rnd = random.Random(1)
+    pixels = [(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(batch)]
+    results = []
+    for mode, fn in COLOR_MODES.items():
+        cfg = dict(BASE_CONFIG, color_mode=mode)
+
+        def run():
+            for r, g, b in pixels:
+                fn(r, g, b, cfg)
+
+        samples = time_calls(run, iterations, budget_s)
+        summary = summarize(samples)
+        summary["ns_per_pixel"] = round(percentile(samples, 50) / batch * 1e9, 1)
+        results.append(dict(bench="color_mode", color_mode=mode, batch=batch, **summary))
+    return results
+
+
+def bench_frames(sizes, thicknesses, iterations, budget_s):
+    """Full per-frame cost: capture into a pooled surface, recolor, present.
+    Plans are built as the overlay builds them: with show_in_capture, a
+    margin of sample_radius around the mask to sample clean pixels from."""
+    radius = max(1, RenderState.FIELDS["sample_radius"])
+    results = []
+    for sz in sizes:
+        frames = {}
+        tick = [0]
+
+        def screen(x, y, n):
+            if n not in frames:
+                frames[n] = synthetic_frames(n, 4, seed=n)
+            tick[0] += 1
+            return frames[n][tick[0] % 4]
+
+        backend = MemoryBackend(screen, record=False)
+        pool = SurfacePool(backend)
+        for shape in SHAPES:
+            for thick in thicknesses:
+                mask = build_mask(shape, sz, thick, 2)
+                plans = {False: RenderPlan(mask, sz), True: RenderPlan(mask, sz, radius, radius)}
+                for mode in COLOR_MODES:
+                    for opacity in OPACITIES:
+                        lut = get_color_lut(dict(BASE_CONFIG, color_mode=mode), opacity)
+                        for show_cap, plan in plans.items():
+                            rects = plan.capture_rects(show_cap)
+
+                            def frame():
+                                surface = pool.acquire(plan.stride)
+                                backend.capture(surface, 0, 0, rects)
+                                render_frame(plan, surface.words, lut, show_cap)
+                                backend.present(surface, None, 0, 0)
+
+                            frame()  # warm the LUT and the surface
+                            samples = time_calls(frame, iterations, budget_s)
+                            results.append(dict(
+                                bench="frame", shape=shape, size=sz, thickness=thick,
+                                color_mode=mode, opacity=opacity, show_in_capture=show_cap,
+                                margin=plan.margin,
+                                masked_pixels=len(plan.index), spans=len(plan.spans),
+                                capture_rects=len(rects),
+                                captured_pixels=sum(w * h for _, _, w, h in rects),
+                                **summarize(samples)))
+        pool.close()
+    return results
+
+
+def bench_moves(sizes, iterations, budget_s):
+    """Per-frame cost when the position changes every frame: a PositionFeed
+    on a synthetic cursor path moves the capture origin only ("move", with
+    and without prediction), against rebuilding the plan and its capture
+    rects at every new position ("rebuild")."""
+    results = []
+    lut = get_color_lut(dict(BASE_CONFIG, color_mode="Adaptive"), 255)
+    for sz in sizes:
+        frames = synthetic_frames(sz, 4, seed=sz)
+        tick = [0]
+
+        def screen(x, y, n):
+            tick[0] += 1
+            return frames[tick[0] % len(frames)]
+
+        def cursor():
+            tick[0] += 1
+            return 960 + (tick[0] * 7) % 400, 540 + (tick[0] * 3) % 200
+
+        backend = MemoryBackend(screen, record=False)
+        pool = SurfacePool(backend)
+        mask = build_cross_mask(sz, 3, 2)
+        for path in ("move", "move_predict", "rebuild"):
+            feed = PositionFeed(cursor, predict=path == "move_predict")
+            plan = RenderPlan(mask, sz)
+            rects = plan.capture_rects(False)
+
+            def frame():
+                nonlocal plan, rects
+                x, y = feed.poll(0.004)
+                if path == "rebuild":
+                    plan = RenderPlan(mask, sz)
+                    rects = plan.capture_rects(False)
+                surface = pool.acquire(sz)
+                backend.capture(surface, x - sz // 2, y - sz // 2, rects)
+                render_frame(plan, surface.words, lut, False)
+                backend.present(surface, None, x - sz // 2, y - sz // 2)
+
+            frame()
+            samples = time_calls(frame, iterations, budget_s)
+            results.append(dict(bench="move", path=path, size=sz, **summarize(samples)))
+        pool.close()
+    return results
+
+
+def run(sizes, thicknesses, iterations, budget_s, only=None):
+    benches = {
+        "mask": lambda: bench_masks(sizes, thicknesses, iterations, budget_s),
+        "color_mode": lambda: bench_color_modes(iterations, budget_s),
+        "frame": lambda: bench_frames(sizes, thicknesses, iterations, budget_s),
+        "move": lambda: bench_moves(sizes, iterations, budget_s),
+    }
+    results = []
+    for name, bench in benches.items():
+        if only and name not in only:
+            continue
+        results.extend(bench())
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "numpy": np.__version__ if np is not None else None,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": iterations,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m crosshair_bench", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--quick", action="store_true", help="small matrix for a fast smoke run")
+    ap.add_argument("--sizes", type=int, nargs="+", help="crosshair sizes to test")
+    ap.add_argument("--thicknesses", type=int, nargs="+", help="thicknesses to test")
+    ap.add_argument("--iterations", type=int, default=200, help="samples per case (default 200)")
+    ap.add_argument("--budget", type=float, default=1.0, help="max seconds per case (default 1.0)")
+    ap.add_argument("--only", nargs="+", choices=("mask", "color_mode", "frame", "move"),
+                    help="run only these benchmark groups")
+    ap.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = ap.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    thicknesses = args.thicknesses or (QUICK_THICKNESSES if args.quick else THICKNESSES)
+    iterations = min(args.iterations, 30) if args.quick else args.iterations
+    report = run(sizes, thicknesses, iterations, args.budget, args.only)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
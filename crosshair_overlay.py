@@ -10,6 +10,19 @@ import time
 import sys
 import faulthandler
 
+from crosshair_surface import (
+    Surface, SurfaceBackend, SurfacePool, CapturePipeline, SharedCaptureBackend,
+)
+from crosshair_timing import (
+    FrameScheduler, AdaptiveRate, FrameTelemetry, AnimationClock, PositionFeed,
+)
+from crosshair_render import (  # noqa: F401 — re-exported for callers
+    COLOR_MODES, RenderPlan, RenderState, ChangeDetector, render_frame, get_color_lut,
+    CAPTURE_RECT_COST, CompositePlan, render_composite, build_atlas,
+    build_mask, build_cross_mask, build_dot_mask, build_circle_mask,
+    color_adaptive, color_invert, color_static, color_max_contrast,
+)
+
 # Enable faulthandler to get traceback on hard crashes
 try:
     faulthandler.enable()
@@ -37,6 +50,7 @@ WM_CLOSE         = 0x0010
 WM_TIMER         = 0x0113
 WM_NCHITTEST     = 0x0084
 WM_MOUSEACTIVATE = 0x0021
+WM_DISPLAYCHANGE = 0x007E
 WM_USER          = 0x0400
 WM_UPDATE_CONFIG = WM_USER + 1   # custom message to live-update settings
 WM_QUIT_OVERLAY  = WM_USER + 2   # custom message to request clean shutdown
@@ -139,6 +153,10 @@ user32.ShowWindow.restype = wintypes.BOOL
 SW_HIDE = 0
 SW_SHOWNA = 8  # Show without activating
 
+# SWP flags — no activation, no z-order change, no repaints, no sent messages
+SWP_FLAGS = 0x0010 | 0x0004 | 0x0008 | 0x0400  # NOACTIVATE|NOZORDER|NOREDRAW|NOSENDCHANGING
+SWP_NOSIZE = 0x0001
+
 # Message loop functions
 user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, ctypes.c_uint, ctypes.c_uint]
 user32.GetMessageW.restype = wintypes.BOOL
@@ -151,6 +169,36 @@ user32.PeekMessageW.restype = wintypes.BOOL
 
 PM_REMOVE = 0x0001
 
+# High-resolution waitable timer (Windows 10 1803+)
+CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+TIMER_ALL_ACCESS = 0x001F0003
+INFINITE = 0xFFFFFFFF
+
+kernel32.CreateWaitableTimerExW.argtypes = [wintypes.LPVOID, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD]
+kernel32.CreateWaitableTimerExW.restype = wintypes.HANDLE
+kernel32.SetWaitableTimer.argtypes = [
+    wintypes.HANDLE, ctypes.POINTER(ctypes.c_longlong), wintypes.LONG,
+    wintypes.LPVOID, wintypes.LPVOID, wintypes.BOOL,
+]
+kernel32.SetWaitableTimer.restype = wintypes.BOOL
+kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+kernel32.WaitForSingleObject.restype = wintypes.DWORD
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+kernel32.CloseHandle.restype = wintypes.BOOL
+
+# Wake event for the idle (background-independent) render path
+QS_ALLINPUT = 0x04FF
+IDLE_WAIT_MS = 500  # bounded, so the loop still checks _running while idle
+
+kernel32.CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+kernel32.CreateEventW.restype = wintypes.HANDLE
+kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+kernel32.SetEvent.restype = wintypes.BOOL
+user32.MsgWaitForMultipleObjects.argtypes = [
+    wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD, wintypes.DWORD,
+]
+user32.MsgWaitForMultipleObjects.restype = wintypes.DWORD
+
 gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
 gdi32.CreateCompatibleDC.restype = wintypes.HDC
 gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
@@ -171,136 +219,144 @@ gdi32.DeleteDC.argtypes = [wintypes.HDC]
 gdi32.DeleteDC.restype = wintypes.BOOL
 gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
 gdi32.DeleteObject.restype = wintypes.BOOL
+gdi32.GdiFlush.argtypes = []
+gdi32.GdiFlush.restype = wintypes.BOOL
 
 
 # ---------------------------------------------------------------------------
-# Mask builder
+# High-resolution sleep
 # ---------------------------------------------------------------------------
 
-def build_cross_mask(sz, thickness, gap=0):
-    center = sz // 2
-    half_t = thickness // 2
-    half_g = gap  # gap extends this many pixels each side from center
-    mask = bytearray(sz * sz)
-    for y in range(sz):
-        for x in range(sz):
-            # Vertical bar
-            if (center - half_t) <= x < (center - half_t + thickness):
-                if not ((center - half_g) <= y <= (center + half_g)):
-                    mask[y * sz + x] = 1
-            # Horizontal bar
-            if (center - half_t) <= y < (center - half_t + thickness):
-                if not ((center - half_g) <= x <= (center + half_g)):
-                    mask[y * sz + x] = 1
-    return bytes(mask)
-
-
-def build_dot_mask(sz, thickness):
-    """Build a filled square dot centered in the mask, sized by thickness."""
-    center = sz // 2
-    half_t = max(1, thickness) // 2
-    t = max(1, thickness)
-    mask = bytearray(sz * sz)
-    for y in range(sz):
-        for x in range(sz):
-            if (center - half_t) <= x < (center - half_t + t):
-                if (center - half_t) <= y < (center - half_t + t):
-                    mask[y * sz + x] = 1
-    return bytes(mask)
-
-
-def build_circle_mask(sz, thickness):
-    import math
-    center = sz / 2.0 - 0.5
-    r_outer = sz / 2.0 - 0.5
-    r_inner = max(0, r_outer - thickness)
-    mask = bytearray(sz * sz)
-    for y in range(sz):
-        for x in range(sz):
-            d = math.sqrt((x - center) ** 2 + (y - center) ** 2)
-            if r_inner <= d <= r_outer:
-                mask[y * sz + x] = 1
-    return bytes(mask)
+class HighResSleep:
+    """``time.sleep`` replacement with sub-millisecond wake-up accuracy.
+
+    Uses a high-resolution waitable timer where the OS supports it; on
+    older systems it raises the global timer resolution to 1 ms for the
+    lifetime of this object and falls back to ``time.sleep``.
+    """
+
+    def __init__(self):
+        self._timer = kernel32.CreateWaitableTimerExW(
+            None, None, CREATE_WAITABLE_TIMER_HIGH_RESOLUTION, TIMER_ALL_ACCESS)
+        self._period_raised = False
+        if not self._timer:
+            try:
+                self._period_raised = ctypes.windll.winmm.timeBeginPeriod(1) == 0
+            except Exception:
+                pass
+
+    def __call__(self, seconds):
+        if seconds <= 0:
+            return
+        if self._timer:
+            due = ctypes.c_longlong(-int(seconds * 10_000_000))  # relative, 100 ns units
+            if kernel32.SetWaitableTimer(self._timer, ctypes.byref(due), 0, None, None, False):
+                kernel32.WaitForSingleObject(self._timer, INFINITE)
+                return
+        time.sleep(seconds)
+
+    def close(self):
+        if self._timer:
+            kernel32.CloseHandle(self._timer)
+            self._timer = None
+        if self._period_raised:
+            try:
+                ctypes.windll.winmm.timeEndPeriod(1)
+            except Exception:
+                pass
+            self._period_raised = False
 
 
 # ---------------------------------------------------------------------------
-# Color modes
+# GDI surface backend
 # ---------------------------------------------------------------------------
 
-def color_adaptive(r, g, b, cfg):
-    """Luminance-adaptive dual-color."""
-    luma = int(0.299 * r + 0.587 * g + 0.114 * b)
-    if luma < cfg.get("luma_threshold", 128):
-        return cfg.get("color_on_dark", (0, 255, 0))
-    else:
-        return cfg.get("color_on_light", (255, 0, 255))
-
-
-def color_invert(r, g, b, _cfg):
-    """Pure RGB inversion."""
-    return (255 - b, 255 - g, 255 - r)
-
-
-def color_static(r, g, b, cfg):
-    """Static single color (ignores background)."""
-    return cfg.get("static_color", (0, 255, 0))
-
-
-def color_max_contrast(r, g, b, _cfg):
-    """Maximum contrast: invert + hue shift + force full saturation/value.
-    Converts to HSV, inverts hue by 180, forces S=1 V=1, then back to RGB.
-    Returns BGR tuple. Guarantees vivid color maximally different from BG."""
-    # Convert RGB to HSV
-    r_f, g_f, b_f = r / 255.0, g / 255.0, b / 255.0
-    mx = max(r_f, g_f, b_f)
-    mn = min(r_f, g_f, b_f)
-    d = mx - mn
-
-    # Hue
-    if d == 0:
-        h = 0.0
-    elif mx == r_f:
-        h = 60.0 * (((g_f - b_f) / d) % 6)
-    elif mx == g_f:
-        h = 60.0 * (((b_f - r_f) / d) + 2)
-    else:
-        h = 60.0 * (((r_f - g_f) / d) + 4)
-
-    # Invert hue by 180 degrees
-    h = (h + 180.0) % 360.0
-
-    # Force S=1, V=1 for maximum vividness
-    s, v = 1.0, 1.0
-
-    # HSV to RGB
-    c = v * s
-    x = c * (1.0 - abs((h / 60.0) % 2 - 1.0))
-    m = v - c
-    if h < 60:
-        r2, g2, b2 = c, x, 0.0
-    elif h < 120:
-        r2, g2, b2 = x, c, 0.0
-    elif h < 180:
-        r2, g2, b2 = 0.0, c, x
-    elif h < 240:
-        r2, g2, b2 = 0.0, x, c
-    elif h < 300:
-        r2, g2, b2 = x, 0.0, c
-    else:
-        r2, g2, b2 = c, 0.0, x
-
-    ri = int((r2 + m) * 255)
-    gi = int((g2 + m) * 255)
-    bi = int((b2 + m) * 255)
-    return (bi, gi, ri)  # BGR
-
-
-COLOR_MODES = {
-    "Adaptive": color_adaptive,
-    "Max Contrast": color_max_contrast,
-    "Invert": color_invert,
-    "Static": color_static,
-}
+class GdiBackend(SurfaceBackend):
+    """Surfaces backed by a DIB section selected into a memory DC.
+
+    The screen DC is held for the backend's lifetime; BitBlt captures the
+    screen straight into the DIB and UpdateLayeredWindow presents from the
+    same memory DC, so no intermediate compatible bitmap is needed. Like
+    its DCs, a backend belongs to one thread.
+    """
+
+    def __init__(self):
+        self._screen_dc = None
+
+    def _screen(self):
+        if not self._screen_dc:
+            self._screen_dc = user32.GetDC(None)
+            if not self._screen_dc:
+                raise ctypes.WinError()
+        return self._screen_dc
+
+    def create(self, sz, height=None):
+        screen_dc = self._screen()
+        height = sz if height is None else height
+        mem_dc = gdi32.CreateCompatibleDC(screen_dc)
+        if not mem_dc:
+            raise ctypes.WinError()
+
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = sz
+        bmi.bmiHeader.biHeight = -height  # top-down
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = BI_RGB
+
+        bits = ctypes.c_void_p()
+        dib = gdi32.CreateDIBSection(screen_dc, ctypes.byref(bmi), DIB_RGB_COLORS,
+                                      ctypes.byref(bits), None, 0)
+        if not dib or not bits.value:
+            if dib:
+                gdi32.DeleteObject(dib)
+            gdi32.DeleteDC(mem_dc)
+            raise ctypes.WinError()
+
+        old = gdi32.SelectObject(mem_dc, dib)
+        # Zero-copy view of the DIB memory; valid until destroy()
+        pixels = (ctypes.c_ubyte * (sz * height * 4)).from_address(bits.value)
+        return Surface(sz, (mem_dc, dib, old), pixels, height)
+
+    def destroy(self, surface):
+        mem_dc, dib, old = surface.handle
+        surface.release()  # views must die before the DIB memory does
+        surface.handle = None
+        try:
+            if old:
+                gdi32.SelectObject(mem_dc, old)
+            gdi32.DeleteObject(dib)
+            gdi32.DeleteDC(mem_dc)
+        except Exception:
+            pass
+
+    def capture(self, surface, x, y, rects=None):
+        mem_dc, screen_dc = surface.handle[0], self._screen()
+        if rects is None:
+            rects = ((0, 0, surface.sz, surface.height),)
+        for rx, ry, w, h in rects:
+            gdi32.BitBlt(mem_dc, rx, ry, w, h, screen_dc, x + rx, y + ry, SRCCOPY)
+        gdi32.GdiFlush()  # make sure the DIB bits are written before we read them
+
+    def present(self, surface, hwnd, x, y, src=None):
+        sx, sy, w, h = src if src is not None else (0, 0, surface.sz, surface.sz)
+        pt_dst = POINT(x, y)
+        pt_src = POINT(sx, sy)
+        wnd_sz = SIZE(w, h)
+        blend = BLENDFUNCTION(AC_SRC_OVER, 0, 255, AC_SRC_ALPHA)
+        user32.UpdateLayeredWindow(
+            hwnd, self._screen(), ctypes.byref(pt_dst), ctypes.byref(wnd_sz),
+            surface.handle[0], ctypes.byref(pt_src), 0, ctypes.byref(blend), ULW_ALPHA,
+        )
+
+    def close(self):
+        if self._screen_dc:
+            try:
+                user32.ReleaseDC(None, self._screen_dc)
+            except Exception:
+                pass
+            self._screen_dc = None
 
 
 # ---------------------------------------------------------------------------
@@ -321,347 +377,992 @@ class CrosshairOverlay:
         CrosshairOverlay._instance_counter += 1
         self._class_name = f"InvertCrosshairOverlay_{CrosshairOverlay._instance_counter}"
 
-        # Current config (thread-safe — only read during timer tick)
+        # Current config. Writers go through update_config, which publishes
+        # an immutable RenderState; the render thread only reads snapshots.
         self.config = {
             "size": 15,
             "thickness": 1,
             "gap": 0,
             "shape": "cross",          # cross | dot | circle
+            "sample_radius": 4,        # show_in_capture: how far to look for clean background
             "color_mode": "Adaptive",  # Adaptive | Invert | Static
             "color_on_dark": (0, 255, 0),
             "color_on_light": (255, 0, 255),
             "luma_threshold": 128,
+            "color_granularity": "pixel",  # pixel | block | arm (Adaptive averaging area)
+            "granularity_block": 8,
             "static_color": (0, 255, 0),
             "offset_x": 0,
             "offset_y": 0,
             "refresh_ms": 7,
+            "refresh_mode": "fixed",   # fixed | auto (idle down when nothing moves)
+            "idle_hz": 10,             # auto mode: slowest rate
+            "idle_after_frames": 30,   # auto mode: unchanged frames before ramping down
             "opacity": 255,            # 1-255
             "show_in_capture": False,   # visible in screen recordings
             "position_mode": "center", # center | manual
             "manual_x": 960,
             "manual_y": 540,
+            "pipelined": False,        # capture the next frame on a worker while this one renders
+            "layers": [],              # composite reticle: per-layer overrides, bottom first
+            "animation": None,         # set through animate()
         }
 
         # Runtime state filled during _run
         self._mask = None
+        self._plan = None
+        self._capture_rects = None     # what of the plan's frame a capture must fill
+        self._capture_target = None    # (stride, x, y, rects) handed to the capture pipeline
         self._sz = 0
         self._wx = 0
         self._wy = 0
         self._color_fn = color_adaptive
-        self._config_dirty = False
+        self._lut = None
+        self._composite = None   # CompositePlan while config["layers"] is set
+        self._layer_luts = ()    # one ColorLUT per composite layer
+        self._static = False     # every pixel's color ignores the background
+        self._atlas = None       # ((plan, composite), ...) per animation frame
+        self._frame_rects = ()   # capture rects per atlas frame (one entry when not animating)
+        self._frame_targets = ()
+        self._anim_clock = None
+        self._anim_index = 0
+        self._anim_held = False  # hold animations: run forward while set
+        self._position_feed = None  # PositionFeed polled every frame while attached
+        self._feed_pos = None    # last center it produced
+        self._moves = 0          # position changes applied without a rebuild
+        self._version = 0
+        self._state = RenderState(0, self.config)
+        self._applied_state = None     # snapshot the render thread last rebuilt from
+        self._presented_version = -1   # newest snapshot version that reached the screen
+        self._presented_cond = threading.Condition()
+        self._screen_size = None       # cached GetSystemMetrics, reset on display change
+        self._pool = None
+        self._display_changed = False
+        self._changes = ChangeDetector()
+        self._scheduler = None
+        self._rate = AdaptiveRate(0.007, 0.1)
+        self._frame_changed = True
+        self._telemetry = FrameTelemetry()
+        self._stage_times = [0.0, 0.0, 0.0]  # capture, process, present of the last paint
+        self._latency = 0.0      # capture start to present end of the last paint
+        self._pipeline = None    # CapturePipeline while config["pipelined"] is on
+        self._capture_sleep = None
+        self._last_error = None
+        self._render_serial = 0  # bumped on every rebuild
+        self._idle_serial = -1   # render serial of the last background-independent frame
+        self._idle_at = None     # where that frame was presented
+        self._idle = False       # loop is parked until the config changes
+        self._wake_event = None  # Win32 event set by _publish while the loop runs
+        self._manager = None     # OverlayManager driving this overlay instead of _run
 
     # ---- public API ----
 
     @property
     def is_running(self):
+        if self._manager is not None:
+            return self._running and self._manager.is_running
         return self._running and self._thread is not None and self._thread.is_alive()
 
     def start(self):
+        if self._manager is not None:
+            raise RuntimeError("overlay is driven by an OverlayManager")
         if self.is_running:
             return
+        self._publish()  # pick up any direct edits to self.config
         self._running = True
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def stop(self):
+        if self._manager is not None:
+            self._manager.remove(self)
+            return
         if not self.is_running:
             return
         self._running = False
+        self._wake()
         if self._thread:
             self._thread.join(timeout=3)
         self._hwnd = None
 
+    @property
+    def painted_frames(self):
+        """Frames that were recolored and presented."""
+        return self._changes.painted
+
+    @property
+    def skipped_frames(self):
+        """Frames skipped because background and config were unchanged."""
+        return self._changes.skipped
+
+    def stats(self):
+        """Live frame statistics (see README), safe to call from any thread."""
+        stats = self._telemetry.stats()
+        stats["painted"] = self._changes.painted
+        stats["skipped"] = self._changes.skipped
+        stats["dropped"] = self._scheduler.dropped if self._scheduler else 0
+        stats["last_error"] = self._last_error
+        stats["idle"] = self._idle
+        stats["moves"] = self._moves
+        pipeline = self._pipeline
+        stats["pipeline"] = None if pipeline is None else {
+            "captured": pipeline.captured,
+            "taken": pipeline.taken,
+            "dropped": pipeline.dropped,
+            "stalls": pipeline.stalls,
+            "depth": pipeline.depth,
+        }
+        return stats
+
+    def animate(self, frames, fps=30, mode="loop"):
+        """Play geometry keyframes (config overrides) at ``fps`` as loop,
+        pingpong or hold, precompiled here; returns the published version."""
+        if mode not in AnimationClock.MODES:
+            raise ValueError(f"unknown animation mode {mode!r}")
+        animation = {"frames": [dict(f) for f in frames], "fps": fps, "mode": mode}
+        with self._lock:
+            state = RenderState(0, dict(self.config, animation=animation))
+        keyframes = state.animation_frames()
+        if not keyframes or len(keyframes) != len(animation["frames"]):
+            raise ValueError("animation frames must keep the reticle's number of layers")
+        margin, radius = _capture_margin(state)
+        show_cap = state.show_in_capture
+        luts = self._layer_luts_for(state)
+        layered = bool(state.layers)
+        for composite in build_atlas(keyframes, margin, radius):  # compile now, cached
+            plan = composite.plan if layered else composite.plans[0]
+            _frame_capture_rects(plan, composite if layered else None, luts, show_cap)
+        return self.update_config(animation=animation)
+
+    def stop_animation(self):
+        """Back to the static reticle of the current config."""
+        return self.update_config(animation=None)
+
+    def hold_animation(self, held=True):
+        """Drive a ``hold`` animation: run toward the last frame while
+        held (e.g. while a key is down) and back toward the first after."""
+        self._anim_held = bool(held)
+        self._wake()
+
+    def set_position_source(self, source, predict=False):
+        """Follow ``source`` (a callable or iterator of screen centers, see
+        PositionFeed) with a move-only fast path; None detaches it."""
+        self._position_feed = None if source is None else PositionFeed(source, predict)
+        self._wake()
+
     def update_config(self, **kwargs):
-        """Update config keys. Takes effect on next timer tick."""
+        """Update config keys. Takes effect on the next frame.
+
+        Returns the version of the published snapshot; pass it to
+        ``wait_for_version`` to block until the change is on screen.
+        """
         with self._lock:
             self.config.update(kwargs)
-            self._config_dirty = True
+            return self._publish_locked()
+
+    def wait_for_version(self, version, timeout=None):
+        """Block until a frame rendered from config ``version`` (or newer)
+        has been presented. Returns False on timeout."""
+        with self._presented_cond:
+            return self._presented_cond.wait_for(
+                lambda: self._presented_version >= version, timeout)
+
+    @property
+    def presented_version(self):
+        return self._presented_version
 
     # ---- internals ----
 
-    def _rebuild(self):
+    def _publish(self):
         with self._lock:
-            cfg = dict(self.config)
-        sz = cfg["size"]
+            return self._publish_locked()
+
+    def _publish_locked(self):
+        self._version += 1
+        self._state = RenderState(self._version, self.config)  # atomic swap
+        self._wake()
+        return self._version
+
+    def _wake(self):
+        event = self._wake_event
+        if event:
+            kernel32.SetEvent(event)
+
+    def _mark_presented(self, version):
+        if version > self._presented_version:
+            with self._presented_cond:
+                self._presented_version = version
+                self._presented_cond.notify_all()
+
+    def _rebuild(self, state):
+        """Apply snapshot ``state``, redoing only what changed since the
+        last one. Returns the set of RenderState.GROUPS that changed."""
+        changed = state.changed_groups(self._applied_state)
+
+        if changed & {"geometry", "affinity"}:
+            self._build_geometry(state)  # the capture margin follows show_in_capture
+        if changed & {"geometry", "position"}:
+            self._place(state)
+        if "color" in changed:
+            self._color_fn = COLOR_MODES.get(state.color_mode, color_adaptive)
+            self._opacity = state.opacity
+            self._lut = get_color_lut(state.config, self._opacity)
+            self._layer_luts = tuple(get_color_lut(config, self._opacity)
+                                     for config in state.layer_configs())
+            self._static = all(lut.constant is not None for lut in self._layer_luts_for(state))
+        if "timing" in changed:
+            self._refresh_ms = state.refresh_ms
+            self._auto_refresh = state.refresh_mode == "auto"
+            self._rate.configure(self._refresh_ms / 1000.0,
+                                 1.0 / max(1, state.idle_hz),
+                                 state.idle_after_frames)
+        if "affinity" in changed:
+            self._show_in_capture = state.show_in_capture
+        if changed & {"geometry", "color", "affinity"}:
+            # Capture only what a frame will read: the mask, its clean
+            # sources and any area-averaging windows
+            luts = self._layer_luts or (self._lut,)
+            self._frame_rects = tuple(
+                _frame_capture_rects(plan, composite, luts, self._show_in_capture)
+                for plan, composite in self._atlas or ((self._plan, self._composite),))
+        self._retarget()
+
+        self._render_serial += 1
+        self._applied_state = state
+        return changed
+
+    def _retarget(self):
+        """Capture targets of every frame for the current window origin."""
+        m = self._plan.margin
+        frames = self._atlas or ((self._plan, self._composite),)
+        targets = []
+        for (plan, _), rects, old in zip(frames, self._frame_rects,
+                                          self._frame_targets + (None,) * len(frames)):
+            target = (plan.stride, self._wx - m, self._wy - m, rects)
+            targets.append(old if target == old else target)  # identity tells a pipelined frame is current
+        self._frame_targets = tuple(targets)
+        self._capture_rects = self._frame_rects[self._anim_index]
+        self._capture_target = self._frame_targets[self._anim_index]
+
+    def _build_geometry(self, state):
+        margin, radius = _capture_margin(state)
+        self._anim_index = 0
+
+        keyframes = state.animation_frames()
+        if keyframes:
+            # Everything an animation can show is compiled once (normally
+            # already cached by animate); frames then only swap plans.
+            layered = bool(state.layers)
+            atlas = build_atlas(keyframes, margin, radius)
+            self._atlas = tuple((c.plan, c) if layered else (c.plans[0], None) for c in atlas)
+            animation = dict(state.animation)
+            mode = animation.get("mode", "loop")
+            self._anim_clock = AnimationClock(
+                len(atlas), animation.get("fps", 30),
+                mode if mode in AnimationClock.MODES else "loop")
+            self._plan, self._composite = self._atlas[0]
+            self._mask = self._plan.mask
+            self._sz = atlas[0].sz
+            return
+        self._atlas = None
+        self._anim_clock = None
+
+        if state.layers:
+            self._composite = CompositePlan(state.geometry_layers(), margin, radius)
+            self._plan = self._composite.plan
+            self._mask = self._plan.mask
+            self._sz = self._composite.sz
+            return
+
+        sz = state.size
         if sz % 2 == 0:
             sz += 1  # force odd
-        shape = cfg["shape"]
-        thick = cfg["thickness"]
-        gap = cfg["gap"]
-
-        if shape == "dot":
-            mask = build_dot_mask(sz, thick)
-        elif shape == "circle":
-            mask = build_circle_mask(sz, thick)
-        else:
-            mask = build_cross_mask(sz, thick, gap)
+        shape = state.shape
+        # gap only shapes the cross; dropping it elsewhere keeps cache hits
+        gap = state.gap if shape not in ("dot", "circle") else 0
+        mask = build_mask(shape, sz, state.thickness, gap)
+        self._composite = None
+        self._mask = mask
+        self._plan = RenderPlan(mask, sz, margin, radius)
+        self._sz = sz
 
-        screen_w = user32.GetSystemMetrics(0)
-        screen_h = user32.GetSystemMetrics(1)
+    def _place(self, state):
+        if self._screen_size is None:
+            self._screen_size = (user32.GetSystemMetrics(0), user32.GetSystemMetrics(1))
+        screen_w, screen_h = self._screen_size
 
-        position_mode = cfg.get("position_mode", "center")
-        if position_mode == "manual":
+        if self._feed_pos is not None:
+            # Following a position source
+            cx, cy = self._feed_pos
+        elif state.position_mode == "manual":
             # Absolute screen coordinates — crosshair centered on that point
-            cx = cfg.get("manual_x", screen_w // 2)
-            cy = cfg.get("manual_y", screen_h // 2)
+            cx = state.manual_x
+            cy = state.manual_y
         else:
             # Center of screen + offset
-            cx = screen_w // 2 + cfg["offset_x"]
-            cy = screen_h // 2 + cfg["offset_y"]
-
-        wx = cx - sz // 2
-        wy = cy - sz // 2
+            cx = screen_w // 2 + state.offset_x
+            cy = screen_h // 2 + state.offset_y
 
-        self._mask = mask
-        self._sz = sz
-        self._wx = wx
-        self._wy = wy
-        self._color_fn = COLOR_MODES.get(cfg["color_mode"], color_adaptive)
-        self._opacity = cfg.get("opacity", 255)
-        self._refresh_ms = cfg.get("refresh_ms", 7)
-        self._show_in_capture = cfg.get("show_in_capture", False)
-
-        return cfg
+        self._wx = cx - self._sz // 2
+        self._wy = cy - self._sz // 2
 
     def _paint(self):
         if not self._paint_lock.acquire(blocking=False):
+            self._telemetry.lock_misses += 1
             return  # skip if already painting
         try:
             self._paint_inner()
-        except Exception:
-            pass  # never crash the timer thread
+        except Exception as e:
+            # never crash the timer thread, but keep count
+            self._telemetry.exceptions += 1
+            self._last_error = repr(e)
         finally:
             self._paint_lock.release()
 
+    def _guarded(self, step):
+        """Run a loop step for the manager the way _paint runs a frame: a
+        failure counts against this overlay instead of ending the loop."""
+        try:
+            step()
+        except Exception as e:
+            self._telemetry.exceptions += 1
+            self._last_error = repr(e)
+
     def _paint_inner(self):
+        if self._manager is None:
+            self._advance()  # a manager advances every overlay before its shared grab
         hwnd = self._hwnd
         sz = self._sz
         wx = self._wx
         wy = self._wy
-        mask = self._mask
-        color_fn = self._color_fn
-        opacity = self._opacity
+        plan = self._plan
 
-        if not hwnd or not mask or sz <= 0 or not self._running:
+        times = self._stage_times
+        times[0] = times[1] = times[2] = 0.0
+        self._latency = 0.0
+        self._frame_changed = True
+        if not hwnd or plan is None or sz <= 0 or not self._running:
             return
 
-        with self._lock:
-            cfg = dict(self.config)
+        clock = time.perf_counter
+        t0 = clock()
+        pool = self._pool
+        m = plan.margin
+        shown = (m, m, sz, sz)  # the window's part of the (possibly widened) surface
+        pipeline = self._pipeline
+        if self._static:
+            # The color ignores the background: no capture, and one present
+            # per config change is enough.
+            if pipeline is not None:
+                pipeline.aim(None)
+            created = pool.created
+            surface = pool.acquire(plan.stride)
+            if self._idle_serial == self._render_serial and pool.created == created:
+                if self._idle_at == (wx, wy):
+                    self._frame_changed = False
+                    return
+                # Only moved: the surface still holds the frame, present it there
+                t1 = t0
+            else:
+                self._render(surface.words)
+                t1 = clock()
+                times[1] = t1 - t0
+            pool.backend.present(surface, hwnd, wx, wy, shown)
+            times[2] = clock() - t1
+            self._latency = times[1] + times[2]
+            self._idle_serial = self._render_serial
+            self._idle_at = (wx, wy)
+            self._changes.reset()  # a later captured frame must not match a pre-static one
+            self._changes.painted += 1
+            self._mark_presented(self._applied_state.version)
+            return
 
-        # Track all GDI resources for guaranteed cleanup
-        screen_dc = None
-        cap_dc = None
-        out_dc = None
-        cap_bmp = None
-        dib = None
-        old_cap = None
-        old_out = None
+        if pipeline is None:
+            surface = pool.acquire(plan.stride)
+            pool.backend.capture(surface, wx - m, wy - m, self._capture_rects)
+            frame = None
+            started = t0
+        else:
+            # The worker captured this frame while the last one was being
+            # processed; capture time here is only the wait for it.
+            target = self._capture_target
+            pipeline.aim(target)
+            frame = pipeline.take(IDLE_WAIT_MS / 1000.0)
+            if frame is None:
+                self._frame_changed = False
+                return
+            if frame.target[3] is not target[3]:  # captured before a config change
+                pipeline.release(frame)
+                return
+            # A frame captured just before a move is still shown, at the
+            # new origin: one frame of capture lag instead of a dropped frame
+            surface = frame.surface
+            started = frame.started
+        t1 = clock()
+        times[0] = t1 - t0
 
         try:
-            screen_dc = user32.GetDC(None)
-            if not screen_dc:
+            # Nothing moved behind the crosshair and the config and position
+            # are the same: the window already shows exactly this frame.
+            if self._changes.unchanged(surface.view, (self._render_serial, wx, wy)):
+                self._frame_changed = False
                 return
 
-            cap_dc = gdi32.CreateCompatibleDC(screen_dc)
-            out_dc = gdi32.CreateCompatibleDC(screen_dc)
-            if not cap_dc or not out_dc:
-                return
+            self._render(surface.words)
+            t2 = clock()
+            times[1] = t2 - t1
+            pool.backend.present(surface, hwnd, wx, wy, shown)
+            t3 = clock()
+            times[2] = t3 - t2
+            self._latency = t3 - started
+        finally:
+            if frame is not None:
+                pipeline.release(frame)
+        self._changes.presented()
+        self._mark_presented(self._applied_state.version)
+
+    def _advance(self):
+        """Per-frame inputs that need no rebuild: the animation frame and
+        the position feed."""
+        self._step_animation()
+        self._poll_position()
+
+    def _poll_position(self):
+        feed = self._position_feed
+        if feed is None:
+            if self._feed_pos is not None:  # detached: back to position_mode
+                self._feed_pos = None
+                self._place(self._applied_state)
+                self._retarget()
+            return
+        pipeline, scheduler = self._pipeline, self._scheduler
+        if pipeline is not None:
+            lead = pipeline.interval
+        elif scheduler is not None:
+            lead = scheduler.interval
+        else:
+            lead = self._refresh_ms / 1000.0
+        pos = feed.poll(lead)
+        if pos is None or pos == self._feed_pos:
+            return
+        # Move-only fast path: new window and capture origin, same plans
+        self._feed_pos = pos
+        self._wx = pos[0] - self._sz // 2
+        self._wy = pos[1] - self._sz // 2
+        self._retarget()
+        self._moves += 1
+
+    def _step_animation(self):
+        anim = self._anim_clock
+        if anim is not None:
+            index = anim.index(self._anim_held)
+            if index != self._anim_index:
+                self._show_frame(index)
+
+    def _show_frame(self, index):
+        """Switch to atlas frame ``index``: a few reference swaps."""
+        self._anim_index = index
+        self._plan, self._composite = self._atlas[index]
+        self._mask = self._plan.mask
+        self._capture_rects = self._frame_rects[index]
+        self._capture_target = self._frame_targets[index]
+        self._render_serial += 1  # what is on screen is out of date
+
+    def _layer_luts_for(self, state):
+        """The ColorLUT of every layer of ``state`` (one for a plain shape)."""
+        configs = state.layer_configs() or [state.config]
+        return tuple(get_color_lut(config, state.opacity) for config in configs)
+
+    def _render(self, words):
+        """Recolor a captured frame in place: one pass for a single shape,
+        one capture shared by every layer of a composite."""
+        if self._composite is not None:
+            render_composite(self._composite, words, self._layer_luts, self._show_in_capture)
+        else:
+            render_frame(self._plan, words, self._lut, self._show_in_capture)
+
+    def _sync_pipeline(self, interval):
+        """Start or stop the capture worker to match config["pipelined"]."""
+        want = self._applied_state.pipelined
+        if want and self._pipeline is None:
+            self._capture_sleep = HighResSleep()  # the loop's timer is not shareable
+            # Nor is its screen DC: GDI DCs must not be used from two threads
+            # at once, so the worker captures through a backend of its own
+            self._pipeline = CapturePipeline(GdiBackend(), interval,
+                                             sleep=self._capture_sleep)
+            self._pipeline.start()
+        elif not want and self._pipeline is not None:
+            self._stop_pipeline()
+
+    def _stop_pipeline(self):
+        pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline.stop()
+            pipeline.backend.close()
+            self._capture_sleep.close()
+            self._capture_sleep = None
+
+    # ---- window and loop steps (shared with OverlayManager) ----
+
+    def _create_window(self, class_name, hInst):
+        """Create this overlay's layered window on the calling thread."""
+        hwnd = user32.CreateWindowExW(
+            OVERLAY_EX_STYLE, class_name, "XH",
+            WS_POPUP | WS_VISIBLE,
+            self._wx, self._wy, self._sz, self._sz,
+            None, None, hInst, None,
+        )
+        if hwnd:
+            affinity = WDA_NONE if self._show_in_capture else WDA_EXCLUDEFROMCAPTURE
+            user32.SetWindowDisplayAffinity(hwnd, affinity)
+        return hwnd
+
+    def _apply_pending(self):
+        """Handle a display change and apply the newest config snapshot,
+        moving the window to match. Returns the changed groups (empty set
+        when nothing changed)."""
+        # Display mode changed: drop the surface, re-center the window
+        if self._display_changed:
+            self._display_changed = False
+            self._pool.invalidate()
+            self._changes.reset()
+            self._screen_size = None
+            self._applied_state = None
+            self._idle_serial = -1
+            self._stop_pipeline()  # restarted by the caller on the timing change
+
+        # Apply config changes (lock-free: just compare snapshots)
+        state = self._state
+        if state is self._applied_state:
+            return set()
+        changed = self._rebuild(state)
+        self._idle = False
+        if "geometry" in changed:
+            user32.SetWindowPos(self._hwnd, None, self._wx, self._wy,
+                                self._sz, self._sz, SWP_FLAGS)
+        elif "position" in changed:
+            user32.SetWindowPos(self._hwnd, None, self._wx, self._wy,
+                                0, 0, SWP_FLAGS | SWP_NOSIZE)
+        if "affinity" in changed:
+            affinity = WDA_NONE if self._show_in_capture else WDA_EXCLUDEFROMCAPTURE
+            user32.SetWindowDisplayAffinity(self._hwnd, affinity)
+        return changed
+
+    def _parked(self):
+        """True once a background-independent frame is on screen, no
+        newer config is waiting and no animation is moving; nothing needs
+        painting until one is."""
+        anim = self._anim_clock
+        return (self._idle_serial == self._render_serial and self._state is self._applied_state
+                and (anim is None or anim.settled(self._anim_held))
+                and self._position_feed is None and self._feed_pos is None)
+
+    def _next_interval(self):
+        """Frame interval after the paint that just ran."""
+        if self._auto_refresh:
+            return self._rate.update(self._frame_changed)
+        return self._refresh_ms / 1000.0
 
-            cap_bmp = gdi32.CreateCompatibleBitmap(screen_dc, sz, sz)
-            if not cap_bmp:
-                return
+    def _run(self):
+        set_dpi_aware()
+        self._rebuild(self._state)
+        self._pool = SurfacePool(GdiBackend())
 
-            old_cap = gdi32.SelectObject(cap_dc, cap_bmp)
-            gdi32.BitBlt(cap_dc, 0, 0, sz, sz, screen_dc, wx, wy, SRCCOPY)
-
-            bmi = BITMAPINFO()
-            bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
-            bmi.bmiHeader.biWidth = sz
-            bmi.bmiHeader.biHeight = -sz
-            bmi.bmiHeader.biPlanes = 1
-            bmi.bmiHeader.biBitCount = 32
-            bmi.bmiHeader.biCompression = BI_RGB
-
-            bits = ctypes.c_void_p()
-            dib = gdi32.CreateDIBSection(screen_dc, ctypes.byref(bmi), DIB_RGB_COLORS,
-                                          ctypes.byref(bits), None, 0)
-            if not dib or not bits.value:
-                return
+        def display_changed():
+            self._display_changed = True  # handled by the loop
 
-            old_out = gdi32.SelectObject(out_dc, dib)
-            gdi32.BitBlt(out_dc, 0, 0, sz, sz, cap_dc, 0, 0, SRCCOPY)
-
-            # Copy pixel data into a safe Python buffer to avoid access violations
-            num_bytes = sz * sz * 4
-            buf = (ctypes.c_ubyte * num_bytes)()
-            ctypes.memmove(buf, bits.value, num_bytes)
-
-            mask_len = len(mask)
-            alpha_f = opacity / 255.0  # premultiply factor
-            show_cap = self._show_in_capture
-            for i in range(sz * sz):
-                off = i * 4
-                if i < mask_len and mask[i]:
-                    # When visible in recordings, sample from nearest
-                    # non-masked neighbor to avoid self-capture feedback.
-                    # The crosshair's own rendered pixels are under the mask,
-                    # so we read from an adjacent clean pixel instead (1px away).
-                    if show_cap:
-                        px, py = i % sz, i // sz
-                        b, g, r = buf[off], buf[off + 1], buf[off + 2]  # fallback
-                        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                            nx, ny = px + dx, py + dy
-                            if 0 <= nx < sz and 0 <= ny < sz:
-                                ni = ny * sz + nx
-                                if ni < mask_len and not mask[ni]:
-                                    noff = ni * 4
-                                    b, g, r = buf[noff], buf[noff + 1], buf[noff + 2]
-                                    break
-                    else:
-                        b, g, r = buf[off], buf[off + 1], buf[off + 2]
-                    try:
-                        cb, cg, cr = color_fn(r, g, b, cfg)
-                    except Exception:
-                        cb, cg, cr = 255 - b, 255 - g, 255 - r
-                    # Premultiplied alpha: RGB must be scaled by alpha/255
-                    cb = max(0, min(255, int(cb * alpha_f)))
-                    cg = max(0, min(255, int(cg * alpha_f)))
-                    cr = max(0, min(255, int(cr * alpha_f)))
-                    buf[off] = cb
-                    buf[off + 1] = cg
-                    buf[off + 2] = cr
-                    buf[off + 3] = opacity
-                else:
-                    buf[off] = 0
-                    buf[off + 1] = 0
-                    buf[off + 2] = 0
-                    buf[off + 3] = 0
-
-            # Write the processed buffer back to the DIB
-            ctypes.memmove(bits.value, buf, num_bytes)
-
-            pt_dst = POINT(wx, wy)
-            pt_src = POINT(0, 0)
-            wnd_sz = SIZE(sz, sz)
-            blend = BLENDFUNCTION(AC_SRC_OVER, 0, 255, AC_SRC_ALPHA)
-
-            user32.UpdateLayeredWindow(
-                hwnd, screen_dc, ctypes.byref(pt_dst), ctypes.byref(wnd_sz),
-                out_dc, ctypes.byref(pt_src), 0, ctypes.byref(blend), ULW_ALPHA,
-            )
-        finally:
-            # Guaranteed GDI resource cleanup — prevents handle leak
+        hInst = kernel32.GetModuleHandleW(None)
+        self._wndclass = register_window_class(self._class_name, hInst, display_changed)
+        self._hwnd = self._create_window(self._class_name, hInst)
+
+        if not self._hwnd:
+            self._running = False
+            return
+
+        sleeper = HighResSleep()
+        self._scheduler = FrameScheduler(self._refresh_ms / 1000.0, sleep=sleeper)
+        wake_event = kernel32.CreateEventW(None, False, False, None)
+        wake_handles = (wintypes.HANDLE * 1)(wake_event)
+        self._wake_event = wake_event
+        self._sync_pipeline(self._refresh_ms / 1000.0)
+
+        # ===== Main loop: deadline-paced, no WM_TIMER, no re-entrancy possible =====
+        while self._running:
             try:
-                if old_out and out_dc:
-                    gdi32.SelectObject(out_dc, old_out)
-                if old_cap and cap_dc:
-                    gdi32.SelectObject(cap_dc, old_cap)
-                if dib:
-                    gdi32.DeleteObject(dib)
-                if cap_bmp:
-                    gdi32.DeleteObject(cap_bmp)
-                if cap_dc:
-                    gdi32.DeleteDC(cap_dc)
-                if out_dc:
-                    gdi32.DeleteDC(out_dc)
-                if screen_dc:
-                    user32.ReleaseDC(None, screen_dc)
-            except Exception:
-                pass
+                pump_messages(self._hwnd)
 
-    def _run(self):
-        # DPI
+                if "timing" in self._apply_pending():
+                    self._sync_pipeline(self._refresh_ms / 1000.0)
+
+                # Paint
+                frame_start = time.perf_counter()
+                self._paint()
+
+                # Background-independent frame already on screen: park until
+                # a config change (or any window message) wakes us.
+                if self._parked():
+                    if not self._idle:  # log the one frame this config needed
+                        self._idle = True
+                        self._telemetry.record(frame_start, *self._stage_times, 0.0,
+                                               self._latency)
+                    user32.MsgWaitForMultipleObjects(1, wake_handles, False,
+                                                     IDLE_WAIT_MS, QS_ALLINPUT)
+                    self._scheduler.reset()
+                    continue
+                self._idle = False
+
+                # Wait for the next frame deadline (paint time already absorbed)
+                interval = self._next_interval()
+                if self._pipeline is not None:
+                    # The capture worker keeps the deadlines; the next take
+                    # blocks until its frame is ready.
+                    self._pipeline.interval = interval
+                    overshoot = self._pipeline.scheduler.last_overshoot
+                else:
+                    self._scheduler.interval = interval
+                    overshoot = self._scheduler.wait()
+                self._telemetry.record(frame_start, *self._stage_times, overshoot,
+                                       self._latency)
+
+            except BaseException as e:
+                self._last_error = repr(e)  # stats() shows why the overlay stopped
+                break
+
+        # Cleanup
+        try:
+            self._stop_pipeline()
+        except Exception:
+            pass
         try:
-            ctypes.windll.shcore.SetProcessDpiAwareness(1)
+            self._pool.close()
         except Exception:
             pass
+        sleeper.close()
+        self._wake_event = None
+        self._idle = False
+        kernel32.CloseHandle(wake_event)
+        try:
+            if self._hwnd:
+                user32.DestroyWindow(self._hwnd)
+        except Exception:
+            pass
+        self._running = False
+        self._hwnd = None
 
-        cfg = self._rebuild()
 
-        # Minimal WNDPROC — NO heavy work here, just hit-test passthrough.
-        # All painting/rebuilding happens in the loop below, never in a callback.
-        def wnd_proc(hwnd, msg, wparam, lparam):
-            try:
-                if msg == WM_NCHITTEST:
-                    return HTTRANSPARENT
-                if msg == WM_MOUSEACTIVATE:
-                    return MA_NOACTIVATEANDEAT
-            except BaseException:
-                pass
-            try:
-                return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
-            except BaseException:
-                return 0
+def _capture_margin(state):
+    """``(margin, radius)`` for ``state``: visible in recordings, capture a
+    margin around the window so masked pixels can sample clean background
+    up to the radius away."""
+    radius = max(1, state.sample_radius)
+    return (radius if state.show_in_capture else 0), radius
 
-        self._wnd_proc = WNDPROCTYPE(wnd_proc)  # prevent GC
 
-        hInst = kernel32.GetModuleHandleW(None)
+def _frame_capture_rects(plan, composite, luts, show_cap):
+    """Capture rects for one reticle frame: ``plan`` alone, or every layer
+    of ``composite`` with its LUT from ``luts``. Block/arm Adaptive adds
+    its decision windows."""
+    plans = composite.plans if composite else (plan,)
+    regions = tuple(
+        layer.regions(lut.granularity, lut.block, show_cap)
+        if lut.palette is not None and lut.granularity in ("block", "arm") else None
+        for layer, lut in zip(plans, luts))
+    if composite:
+        return composite.capture_rects(show_cap, regions)
+    return plan.capture_rects(show_cap, regions[0])
 
-        # Unregister old class if it exists (from a previous start/stop cycle)
+
+# ---------------------------------------------------------------------------
+# Window plumbing shared by CrosshairOverlay and OverlayManager
+# ---------------------------------------------------------------------------
+
+OVERLAY_EX_STYLE = (WS_EX_TOPMOST | WS_EX_TRANSPARENT | WS_EX_LAYERED |
+                    WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE)
+
+
+def set_dpi_aware():
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+    except Exception:
+        pass
+
+
+def register_window_class(class_name, hInst, on_display_change):
+    """Register the click-through overlay window class.
+
+    Returns the WNDCLASS, which keeps the WNDPROC alive; hold on to it
+    for as long as windows of the class exist.
+    """
+    # Minimal WNDPROC — NO heavy work here, just hit-test passthrough.
+    # All painting/rebuilding happens in the render loop, never in a callback.
+    def wnd_proc(hwnd, msg, wparam, lparam):
         try:
-            user32.UnregisterClassW(self._class_name, hInst)
-        except Exception:
+            if msg == WM_NCHITTEST:
+                return HTTRANSPARENT
+            if msg == WM_MOUSEACTIVATE:
+                return MA_NOACTIVATEANDEAT
+            if msg == WM_DISPLAYCHANGE:
+                on_display_change()
+        except BaseException:
             pass
+        try:
+            return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+        except BaseException:
+            return 0
+
+    # Unregister old class if it exists (from a previous start/stop cycle)
+    try:
+        user32.UnregisterClassW(class_name, hInst)
+    except Exception:
+        pass
+
+    wc = WNDCLASS()
+    wc.lpfnWndProc = WNDPROCTYPE(wnd_proc)  # referenced by wc: not collected
+    wc.lpszClassName = class_name
+    wc.hInstance = hInst
+    wc._wnd_proc = wc.lpfnWndProc
+    user32.RegisterClassW(ctypes.byref(wc))
+    return wc
+
+
+def pump_messages(hwnd):
+    """Drain pending window messages (non-blocking); ``hwnd`` None drains
+    every window of the calling thread."""
+    msg = wintypes.MSG()
+    while user32.PeekMessageW(ctypes.byref(msg), hwnd, 0, 0, PM_REMOVE):
+        user32.TranslateMessage(ctypes.byref(msg))
+        user32.DispatchMessageW(ctypes.byref(msg))
 
-        wc = WNDCLASS()
-        wc.lpfnWndProc = self._wnd_proc
-        wc.lpszClassName = self._class_name
-        wc.hInstance = hInst
-        self._wndclass = wc  # prevent GC
-        user32.RegisterClassW(ctypes.byref(wc))
 
-        ex_style = (WS_EX_TOPMOST | WS_EX_TRANSPARENT | WS_EX_LAYERED |
-                    WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE)
+# ---------------------------------------------------------------------------
+# Several overlays, one thread
+# ---------------------------------------------------------------------------
 
-        self._hwnd = user32.CreateWindowExW(
-            ex_style, self._class_name, "XH",
-            WS_POPUP | WS_VISIBLE,
-            self._wx, self._wy, self._sz, self._sz,
-            None, None, hInst, None,
-        )
+class OverlayManager:
+    """Runs any number of crosshair overlays from one thread, with one
+    shared screen grab per tick."""
 
-        if not self._hwnd:
-            self._running = False
+    _instance_counter = 0
+
+    def __init__(self):
+        self._overlays = []       # replaced, never mutated: read lock-free by the thread
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        OverlayManager._instance_counter += 1
+        self._class_name = f"InvertCrosshairManager_{OverlayManager._instance_counter}"
+        self._backend = None
+        self._wake_event = None
+        self._display_changed = False
+        self._scheduler = None
+        self._telemetry = FrameTelemetry()
+        self._stage_times = [0.0, 0.0, 0.0]  # grab, recolor (all overlays), present (all overlays)
+        self._idle = False
+        self._last_error = None
+
+    @property
+    def is_running(self):
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def overlays(self):
+        return list(self._overlays)
+
+    def add(self, **config):
+        """Create an overlay driven by this manager and return it; keyword
+        arguments are config overrides. Its window appears on the next
+        tick if the manager is running."""
+        overlay = CrosshairOverlay()
+        overlay.config.update(config)
+        overlay._publish()
+        overlay._manager = self
+        with self._lock:
+            self._overlays = self._overlays + [overlay]
+        self._wake()
+        return overlay
+
+    def remove(self, overlay):
+        """Stop driving ``overlay``; its window closes on the next tick."""
+        with self._lock:
+            self._overlays = [o for o in self._overlays if o is not overlay]
+        self._wake()
+
+    def start(self):
+        if self.is_running:
             return
+        for overlay in self._overlays:
+            overlay._publish()  # pick up any direct edits to overlay.config
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
 
-        affinity = WDA_NONE if self._show_in_capture else WDA_EXCLUDEFROMCAPTURE
-        user32.SetWindowDisplayAffinity(self._hwnd, affinity)
+    def stop(self):
+        if not self.is_running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=3)
 
-        # SWP flags — no activation, no z-order change, no repaints, no sent messages
-        SWP_FLAGS = 0x0010 | 0x0004 | 0x0008 | 0x0400  # NOACTIVATE|NOZORDER|NOREDRAW|NOSENDCHANGING
+    def stats(self):
+        """Manager-wide frame statistics (see README), safe to call from any thread."""
+        stats = self._telemetry.stats()
+        backend = self._backend
+        stats["overlays"] = len(self._overlays)
+        stats["grabs"] = backend.grabs if backend else 0
+        stats["shared_captures"] = backend.captures if backend else 0
+        stats["capture_misses"] = backend.misses if backend else 0
+        stats["dropped"] = self._scheduler.dropped if self._scheduler else 0
+        stats["idle"] = self._idle
+        stats["last_error"] = self._last_error
+        return stats
 
-        # ===== Main loop: sleep-based, no WM_TIMER, no re-entrancy possible =====
-        while self._running:
-            try:
-                # Drain any pending window messages (non-blocking)
-                msg = wintypes.MSG()
-                while user32.PeekMessageW(ctypes.byref(msg), self._hwnd, 0, 0, PM_REMOVE):
-                    user32.TranslateMessage(ctypes.byref(msg))
-                    user32.DispatchMessageW(ctypes.byref(msg))
-
-                # Apply config changes
-                if self._config_dirty:
-                    self._config_dirty = False
-                    self._rebuild()
-                    user32.SetWindowPos(self._hwnd, None, self._wx, self._wy,
-                                        self._sz, self._sz, SWP_FLAGS)
-                    affinity = WDA_NONE if self._show_in_capture else WDA_EXCLUDEFROMCAPTURE
-                    user32.SetWindowDisplayAffinity(self._hwnd, affinity)
+    # ---- internals ----
 
-                # Paint
-                self._paint()
+    def _wake(self):
+        event = self._wake_event
+        if event:
+            kernel32.SetEvent(event)
+
+    def _on_display_change(self):
+        self._display_changed = True
+
+    def _open(self, overlay, hInst):
+        overlay._rebuild(overlay._state)
+        overlay._pool = SurfacePool(self._backend)
+        overlay._wake_event = self._wake_event
+        overlay._hwnd = overlay._create_window(self._class_name, hInst)
+        overlay._running = bool(overlay._hwnd)
+
+    def _close(self, overlay):
+        overlay._running = False
+        overlay._wake_event = None
+        overlay._idle = False
+        try:
+            overlay._pool.release()  # the backend is shared: release, not close
+        except Exception:
+            pass
+        try:
+            if overlay._hwnd:
+                user32.DestroyWindow(overlay._hwnd)
+        except Exception:
+            pass
+        overlay._hwnd = None
+        if overlay not in self._overlays:
+            overlay._manager = None  # removed: free to run on its own again
+
+    def _grab(self, live):
+        """One screen capture covering every overlay that reads the screen.
+
+        Skipped when the overlays sit so far apart that their bounding
+        rectangle costs more than capturing each region on its own (same
+        cost model as plan_capture_rects).
+        """
+        x0 = y0 = None
+        area = count = 0
+        for overlay in live:
+            if overlay._lut is None or overlay._static:
+                continue
+            _, x, y, rects = overlay._capture_target
+            for rx, ry, w, h in rects:
+                area += w * h
+                count += 1
+                if x0 is None:
+                    x0, y0, x1, y1 = x + rx, y + ry, x + rx + w, y + ry + h
+                else:
+                    x0, y0 = min(x0, x + rx), min(y0, y + ry)
+                    x1, y1 = max(x1, x + rx + w), max(y1, y + ry + h)
+        if x0 is not None and (x1 - x0) * (y1 - y0) <= area + CAPTURE_RECT_COST * (count - 1):
+            self._backend.grab(x0, y0, x1 - x0, y1 - y0)
+        else:
+            self._backend.skip()
+
+    def _run(self):
+        set_dpi_aware()
+        self._backend = SharedCaptureBackend(GdiBackend())
+        hInst = kernel32.GetModuleHandleW(None)
+        self._wndclass = register_window_class(self._class_name, hInst, self._on_display_change)
 
-                # Sleep for refresh interval
-                time.sleep(self._refresh_ms / 1000.0)
+        sleeper = HighResSleep()
+        self._scheduler = FrameScheduler(0.007, sleep=sleeper)
+        wake_event = kernel32.CreateEventW(None, False, False, None)
+        wake_handles = (wintypes.HANDLE * 1)(wake_event)
+        self._wake_event = wake_event
 
-            except BaseException:
+        clock = time.perf_counter
+        times = self._stage_times
+        live = []
+        while self._running:
+            try:
+                pump_messages(None)
+
+                # Open windows for added overlays, close removed ones
+                overlays = self._overlays
+                if overlays != live:
+                    for overlay in live:
+                        if overlay not in overlays:
+                            self._close(overlay)
+                    for overlay in overlays:
+                        if overlay not in live:
+                            self._open(overlay, hInst)
+                    live = list(overlays)
+
+                if self._display_changed:
+                    self._display_changed = False
+                    self._backend.release()
+                    for overlay in live:
+                        overlay._display_changed = True
+                for overlay in live:
+                    overlay._guarded(overlay._apply_pending)
+
+                frame_start = clock()
+                for overlay in live:
+                    overlay._guarded(overlay._advance)  # grab where and what this tick needs
+                self._grab(live)
+                t1 = clock()
+                times[0] = t1 - frame_start
+                times[1] = times[2] = 0.0
+                for overlay in live:
+                    overlay._paint()
+                    times[1] += overlay._stage_times[0] + overlay._stage_times[1]
+                    times[2] += overlay._stage_times[2]
+
+                # Park while every overlay shows a background-independent frame
+                if all(overlay._parked() for overlay in live):
+                    if not self._idle:
+                        self._idle = True
+                        for overlay in live:
+                            overlay._idle = True
+                        self._telemetry.record(frame_start, *times, 0.0)
+                    user32.MsgWaitForMultipleObjects(1, wake_handles, False,
+                                                     IDLE_WAIT_MS, QS_ALLINPUT)
+                    self._scheduler.reset()
+                    continue
+                self._idle = False
+
+                interval = min(overlay._next_interval() for overlay in live
+                               if not overlay._parked())
+                self._scheduler.interval = interval
+                overshoot = self._scheduler.wait()
+                self._telemetry.record(frame_start, *times, overshoot)
+                for overlay in live:
+                    overlay._idle = overlay._parked()
+                    overlay._telemetry.record(frame_start, *overlay._stage_times, overshoot,
+                                              overlay._latency)
+
+            except BaseException as e:
+                self._last_error = repr(e)  # stats() shows why every overlay stopped
                 break
 
         # Cleanup
+        for overlay in live:
+            self._close(overlay)
         try:
-            if self._hwnd:
-                user32.DestroyWindow(self._hwnd)
+            self._backend.close()
         except Exception:
             pass
+        sleeper.close()
+        self._wake_event = None
+        self._idle = False
+        kernel32.CloseHandle(wake_event)
         self._running = False
-        self._hwnd = None
@@ -0,0 +1,1177 @@
+"""
+Crosshair render core — mask builders, color modes and the per-frame pixel
+pipeline. Pure Python with no Win32 dependencies, so it can be imported and
+exercised headless on any platform.
+"""
+
+import functools
+import itertools
+import math
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+
+try:
+    import numpy as np
+except ImportError:  # optional — the pure-Python loop is used without it
+    np = None
+
+
+# ---------------------------------------------------------------------------
+# Mask builder
+# ---------------------------------------------------------------------------
+
+MASK_CACHE_SIZE = 64  # (shape, size, thickness, gap) masks kept by build_mask
+ATLAS_CACHE_SIZE = 8  # compiled animations kept by build_atlas
+CAPTURE_RECT_COST = 1024  # fixed cost of one more capture blit, in pixels copied
+
+
+def _span(lo, hi, sz):
+    """Clip the half-open span [lo, hi) to the row [0, sz)."""
+    return max(0, lo), min(sz, hi)
+
+
+def build_cross_mask(sz, thickness, gap=0):
+    """Plus-shaped mask; ``gap`` pixels around the center on each side are
+    left open. Built row by row from whole spans instead of per pixel."""
+    center = sz // 2
+    half_t = thickness // 2
+    half_g = gap  # gap extends this many pixels each side from center
+    bar0, bar1 = _span(center - half_t, center - half_t + thickness, sz)
+    gap0, gap1 = _span(center - half_g, center + half_g + 1, sz)
+
+    # Rows outside the horizontal bar: just the vertical bar (or nothing
+    # inside the gap). Rows of the horizontal bar: full width minus the
+    # gap, plus the vertical bar unless the row itself is inside the gap.
+    empty = bytes(sz)
+    arm_row = bytearray(sz)
+    arm_row[bar0:bar1] = b"\x01" * max(0, bar1 - bar0)
+    bar_row_in_gap = bytearray(b"\x01" * sz)
+    if gap1 > gap0:
+        bar_row_in_gap[gap0:gap1] = bytes(gap1 - gap0)
+    bar_row = bytearray(bar_row_in_gap)
+    bar_row[bar0:bar1] = arm_row[bar0:bar1]
+    arm_row, bar_row, bar_row_in_gap = bytes(arm_row), bytes(bar_row), bytes(bar_row_in_gap)
+
+    rows = []
+    for y in range(sz):
+        in_gap = gap0 <= y < gap1
+        if bar0 <= y < bar1:
+            rows.append(bar_row_in_gap if in_gap else bar_row)
+        else:
+            rows.append(empty if in_gap else arm_row)
+    return b"".join(rows)
+
+
+def build_dot_mask(sz, thickness):
+    """Build a filled square dot centered in the mask, sized by thickness."""
+    center = sz // 2
+    t = max(1, thickness)
+    half_t = t // 2
+    x0, x1 = _span(center - half_t, center - half_t + t, sz)
+    row = bytearray(sz)
+    row[x0:x1] = b"\x01" * max(0, x1 - x0)
+    row = bytes(row)
+    empty = bytes(sz)
+    return b"".join(row if x0 <= y < x1 else empty for y in range(sz))
+
+
+def build_circle_mask(sz, thickness):
+    """Ring mask. Each row is filled as (at most) two chords between the
+    inner and outer radius; chord ends are found analytically and then
+    snapped with the exact per-pixel distance test, so the result matches
+    a pixel-by-pixel ``r_inner <= d <= r_outer`` scan bit for bit."""
+    center = sz / 2.0 - 0.5
+    r_outer = sz / 2.0 - 0.5
+    r_inner = max(0, r_outer - thickness)
+    sqrt = math.sqrt
+    mask = bytearray(sz * sz)
+    for y in range(sz):
+        dy2 = (y - center) ** 2
+
+        def dist(x):
+            return sqrt((x - center) ** 2 + dy2)
+
+        # Outer chord: the widest run with dist <= r_outer (dist grows with |x - center|)
+        half = sqrt(max(0.0, r_outer * r_outer - dy2))
+        lo = max(0, int(math.ceil(center - half)))
+        while lo <= center and dist(lo) > r_outer:
+            lo += 1
+        while lo > 0 and dist(lo - 1) <= r_outer:
+            lo -= 1
+        if lo > center or dist(lo) > r_outer:
+            continue  # row misses the ring entirely
+        hi = sz - 1 - lo  # mirror image of lo around the center
+
+        # Inner hole: the run with dist < r_inner, cut out of the chord
+        row = y * sz
+        hole = r_inner * r_inner - dy2
+        if hole > 0:
+            ilo = max(lo, int(math.floor(center - sqrt(hole))))
+            while ilo <= center and dist(ilo) >= r_inner:
+                ilo += 1
+            while ilo > lo and dist(ilo - 1) < r_inner:
+                ilo -= 1
+            if ilo <= center and dist(ilo) < r_inner:
+                ihi = sz - 1 - ilo
+                mask[row + lo:row + ilo] = b"\x01" * (ilo - lo)
+                mask[row + ihi + 1:row + hi + 1] = b"\x01" * (hi - ihi)
+                continue
+        mask[row + lo:row + hi + 1] = b"\x01" * (hi - lo + 1)
+    return bytes(mask)
+
+
+@functools.lru_cache(maxsize=MASK_CACHE_SIZE)
+def build_mask(shape, sz, thickness, gap=0):
+    """Cached mask for ``shape`` (cross | dot | circle; anything else is a
+    cross). Scrubbing a slider back and forth hits this cache."""
+    if shape == "dot":
+        return build_dot_mask(sz, thickness)
+    if shape == "circle":
+        return build_circle_mask(sz, thickness)
+    return build_cross_mask(sz, thickness, gap)
+
+
+def mask_spans(mask, sz):
+    """Run-length form of a mask: ``(row, x_start, x_end)`` for every
+    horizontal run of set pixels, ``x_end`` exclusive, in row-major order."""
+    spans = []
+    find = mask.find
+    for y in range(sz):
+        row, end = y * sz, y * sz + sz
+        x = find(b"\x01", row, end)
+        while x != -1:
+            stop = find(b"\x00", x, end)
+            if stop == -1:
+                stop = end
+            spans.append((y, x - row, stop - row))
+            x = find(b"\x01", stop, end)
+    return spans
+
+
+def _add_interval(clusters, a, b):
+    """Insert [a, b) into a sorted list of disjoint intervals, merging
+    whatever it overlaps or touches. Returns the new list."""
+    out = []
+    for c0, c1 in clusters:
+        if c1 < a or c0 > b:
+            out.append((c0, c1))
+        else:
+            a, b = min(a, c0), max(b, c1)
+    out.append((a, b))
+    out.sort()
+    return out
+
+
+def _band_rects(clusters, h, rect_cost):
+    """Column ranges for one band of height ``h``: neighbouring clusters
+    are joined when the gap between them is cheaper than another blit."""
+    joined = []
+    for a, b in clusters:
+        if joined and (a - joined[-1][1]) * h <= rect_cost:
+            joined[-1] = (joined[-1][0], b)
+        else:
+            joined.append((a, b))
+    return joined
+
+
+def plan_capture_rects(need, width, rect_cost=CAPTURE_RECT_COST, max_bands=48):
+    """Cover every set pixel of ``need`` (a ``width×width`` byte map) with
+    a few ``(x, y, w, h)`` rectangles.
+
+    Each rectangle costs its area plus ``rect_cost`` (the fixed overhead of
+    one more blit). Rows are cut into horizontal bands where the needed
+    runs change (at most ``max_bands`` candidate cuts, spread evenly); in
+    each band the runs' column ranges become one rectangle per cluster,
+    and a small dynamic program picks the band cuts with the lowest total
+    cost. A cross comes out as three strips, a ring as bands hugging the
+    annulus, a dot as a single square.
+    """
+    rows = [[] for _ in range(width)]
+    for y, a, b in mask_spans(need, width):
+        rows[y].append((a, b))
+    used = [y for y in range(width) if rows[y]]
+    if not used:
+        return []
+    top, bottom = used[0], used[-1] + 1
+    cuts = [y for y in range(top + 1, bottom) if rows[y] != rows[y - 1]]
+    if len(cuts) > max_bands - 1:
+        step = len(cuts) / (max_bands - 1)
+        cuts = [cuts[int(k * step)] for k in range(max_bands - 1)]
+    edges = [top] + cuts + [bottom]
+
+    n = len(edges)
+    best = [0] + [None] * (n - 1)
+    choice = [None] * n
+    for i in range(n - 1):
+        clusters = []
+        for j in range(i + 1, n):
+            for y in range(edges[j - 1], edges[j]):
+                for a, b in rows[y]:
+                    clusters = _add_interval(clusters, a, b)
+            h = edges[j] - edges[i]
+            band = _band_rects(clusters, h, rect_cost)
+            total = best[i] + sum(rect_cost + (b - a) * h for a, b in band)
+            if best[j] is None or total < best[j]:
+                best[j] = total
+                choice[j] = (i, band)
+
+    rects = []
+    j = n - 1
+    while j > 0:
+        i, band = choice[j]
+        y0, h = edges[i], edges[j] - edges[i]
+        rects.extend((a, y0, b - a, h) for a, b in band)
+        j = i
+    rects.reverse()
+    return rects
+
+
+# ---------------------------------------------------------------------------
+# Color modes
+# ---------------------------------------------------------------------------
+
+# BT.601 luma weights as integer tables scaled by LUMA_SCALE, so
+# ``luma < T`` is exactly ``LUMA_R[r] + LUMA_G[g] + LUMA_B[b] < T * LUMA_SCALE``
+# with no float rounding at integer boundaries.
+LUMA_SCALE = 1000
+LUMA_WEIGHTS = (299, 587, 114)  # r, g, b
+LUMA_R = tuple(LUMA_WEIGHTS[0] * v for v in range(256))
+LUMA_G = tuple(LUMA_WEIGHTS[1] * v for v in range(256))
+LUMA_B = tuple(LUMA_WEIGHTS[2] * v for v in range(256))
+
+# How much of the background one Adaptive color decision looks at
+GRANULARITIES = ("pixel", "block", "arm")
+
+
+def color_adaptive(r, g, b, cfg):
+    """Luminance-adaptive dual-color."""
+    luma = (LUMA_R[r] + LUMA_G[g] + LUMA_B[b]) // LUMA_SCALE
+    if luma < cfg.get("luma_threshold", 128):
+        return cfg.get("color_on_dark", (0, 255, 0))
+    else:
+        return cfg.get("color_on_light", (255, 0, 255))
+
+
+def color_invert(r, g, b, _cfg):
+    """Pure RGB inversion."""
+    return (255 - b, 255 - g, 255 - r)
+
+
+def color_static(r, g, b, cfg):
+    """Static single color (ignores background)."""
+    return cfg.get("static_color", (0, 255, 0))
+
+
+def color_max_contrast(r, g, b, _cfg):
+    """Maximum contrast: invert + hue shift + force full saturation/value.
+    Converts to HSV, inverts hue by 180, forces S=1 V=1, then back to RGB.
+    Returns BGR tuple. Guarantees vivid color maximally different from BG."""
+    # Convert RGB to HSV
+    r_f, g_f, b_f = r / 255.0, g / 255.0, b / 255.0
+    mx = max(r_f, g_f, b_f)
+    mn = min(r_f, g_f, b_f)
+    d = mx - mn
+
+    # Hue
+    if d == 0:
+        h = 0.0
+    elif mx == r_f:
+        h = 60.0 * (((g_f - b_f) / d) % 6)
+    elif mx == g_f:
+        h = 60.0 * (((b_f - r_f) / d) + 2)
+    else:
+        h = 60.0 * (((r_f - g_f) / d) + 4)
+
+    # Invert hue by 180 degrees
+    h = (h + 180.0) % 360.0
+
+    # Force S=1, V=1 for maximum vividness
+    s, v = 1.0, 1.0
+
+    # HSV to RGB
+    c = v * s
+    x = c * (1.0 - abs((h / 60.0) % 2 - 1.0))
+    m = v - c
+    if h < 60:
+        r2, g2, b2 = c, x, 0.0
+    elif h < 120:
+        r2, g2, b2 = x, c, 0.0
+    elif h < 180:
+        r2, g2, b2 = 0.0, c, x
+    elif h < 240:
+        r2, g2, b2 = 0.0, x, c
+    elif h < 300:
+        r2, g2, b2 = x, 0.0, c
+    else:
+        r2, g2, b2 = c, 0.0, x
+
+    ri = int((r2 + m) * 255)
+    gi = int((g2 + m) * 255)
+    bi = int((b2 + m) * 255)
+    return (bi, gi, ri)  # BGR
+
+
+COLOR_MODES = {
+    "Adaptive": color_adaptive,
+    "Max Contrast": color_max_contrast,
+    "Invert": color_invert,
+    "Static": color_static,
+}
+
+
+# ---------------------------------------------------------------------------
+# Color lookup tables
+# ---------------------------------------------------------------------------
+
+LUT_BITS = 6        # bits kept per RGB channel when indexing a table
+LUT_CACHE_SIZE = 8  # recently used (mode, params) tables kept alive
+
+
+def _premultiply(bgr, opacity):
+    """Pack a BGR color as a premultiplied BGRA pixel word for ``opacity``."""
+    alpha_f = opacity / 255.0
+    cb, cg, cr = bgr
+    return (max(0, min(255, int(cb * alpha_f)))
+            | max(0, min(255, int(cg * alpha_f))) << 8
+            | max(0, min(255, int(cr * alpha_f))) << 16
+            | opacity << 24)
+
+
+class ColorLUT:
+    """Quantized RGB → premultiplied BGRA table for one color mode, filled
+    on first use."""
+
+    __slots__ = ("mode", "color_fn", "params", "opacity", "bits", "qmask", "qtable",
+                 "entries", "constant", "byte_table", "palette", "luma_limit",
+                 "granularity", "block", "_alpha_plane", "_shift", "_rep")
+
+    def __init__(self, mode, params, opacity, bits=LUT_BITS):
+        self.mode = mode
+        self.color_fn = COLOR_MODES.get(mode, color_adaptive)
+        self.params = params
+        self.opacity = opacity
+        self.bits = bits
+        self._shift = 8 - bits
+        m = (0xFF << self._shift) & 0xFF
+        # Alpha is left out of the key, so a table holds at most 2^(3*bits)
+        # entries; the bulk path zeroes it after translating (see recolor).
+        self.qmask = m | m << 8 | m << 16
+        self.qtable = bytes(v & m for v in range(256))
+        qmax = (1 << bits) - 1
+        self._rep = [q * 255 // qmax for q in range(qmax + 1)]
+        self.entries = {}
+        self.constant = self.fill(0) if self.color_fn is color_static else None
+        self.byte_table = None
+        self._alpha_plane = b""
+        if self.color_fn is color_invert:
+            alpha_f = opacity / 255.0
+            self.byte_table = bytes(max(0, min(255, int((255 - v) * alpha_f)))
+                                    for v in range(256))
+        self.palette = None
+        self.luma_limit = 0
+        if self.color_fn is color_adaptive:
+            self.palette = (_premultiply(params.get("color_on_dark", (0, 255, 0)), opacity),
+                            _premultiply(params.get("color_on_light", (255, 0, 255)), opacity))
+            self.luma_limit = params.get("luma_threshold", 128) * LUMA_SCALE
+        self.granularity = params.get("color_granularity", "pixel")
+        self.block = max(1, params.get("granularity_block", 8))
+
+    def alpha_plane(self, n):
+        """``n`` alpha bytes for this opacity, for the stride-4 alpha slot."""
+        if len(self._alpha_plane) != n:
+            self._alpha_plane = bytes([self.opacity]) * n
+        return self._alpha_plane
+
+    def lookup(self, word):
+        """Return the premultiplied BGRA word for a captured pixel word."""
+        k = word & self.qmask
+        entry = self.entries.get(k)
+        if entry is None:
+            entry = self.fill(k)
+        return entry
+
+    def fill(self, k):
+        s = self._shift
+        qmax = (1 << self.bits) - 1
+        rep = self._rep
+        r = rep[(k >> (16 + s)) & qmax]
+        g = rep[(k >> (8 + s)) & qmax]
+        b = rep[(k >> s) & qmax]
+        try:
+            bgr = self.color_fn(r, g, b, self.params)
+        except Exception:
+            bgr = (255 - b, 255 - g, 255 - r)
+        entry = _premultiply(bgr, self.opacity)
+        self.entries[k] = entry
+        return entry
+
+
+_lut_cache = OrderedDict()
+_lut_lock = threading.Lock()
+
+
+def get_color_lut(cfg, opacity):
+    """Return the (possibly cached) ColorLUT for the color settings in ``cfg``.
+
+    Tables live in a small LRU keyed by every color setting and the
+    opacity, so flipping between recent settings reuses warm tables.
+    """
+    params = _color_params(cfg)
+    mode = params.pop("color_mode")
+    key = (mode, _freeze(params), opacity)
+    with _lut_lock:
+        lut = _lut_cache.get(key)
+        if lut is not None:
+            _lut_cache.move_to_end(key)
+            return lut
+        lut = ColorLUT(mode, params, opacity)
+        _lut_cache[key] = lut
+        while len(_lut_cache) > LUT_CACHE_SIZE:
+            _lut_cache.popitem(last=False)
+        return lut
+
+
+# ---------------------------------------------------------------------------
+# Config snapshots
+# ---------------------------------------------------------------------------
+
+def _freeze(mapping):
+    """A mapping as sorted ``(key, value)`` pairs, lists turned to tuples."""
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v)
+                        for k, v in dict(mapping).items()))
+
+
+class RenderState:
+    """Immutable, versioned snapshot of the overlay config, published by
+    ``update_config`` and read by the render thread without a lock."""
+
+    FIELDS = {
+        "size": 15, "thickness": 1, "gap": 0, "shape": "cross", "sample_radius": 4,
+        "color_mode": "Adaptive", "color_on_dark": (0, 255, 0),
+        "color_on_light": (255, 0, 255), "luma_threshold": 128,
+        "color_granularity": "pixel", "granularity_block": 8,
+        "static_color": (0, 255, 0), "offset_x": 0, "offset_y": 0,
+        "refresh_ms": 7, "refresh_mode": "fixed", "idle_hz": 10,
+        "idle_after_frames": 30, "opacity": 255, "show_in_capture": False,
+        "position_mode": "center", "manual_x": 960, "manual_y": 540,
+        "pipelined": False, "layers": (), "animation": None,
+    }
+
+    # What each key invalidates; used to apply the cheapest possible update.
+    GROUPS = {
+        "geometry": ("size", "thickness", "gap", "shape", "sample_radius", "layers",
+                     "animation"),
+        "position": ("offset_x", "offset_y", "position_mode", "manual_x", "manual_y"),
+        "color": ("color_mode", "color_on_dark", "color_on_light", "luma_threshold",
+                  "color_granularity", "granularity_block", "static_color", "opacity",
+                  "layers"),
+        "affinity": ("show_in_capture",),
+        "timing": ("refresh_ms", "refresh_mode", "idle_hz", "idle_after_frames",
+                   "pipelined"),
+    }
+
+    __slots__ = ("version", "config") + tuple(FIELDS)
+
+    def __init__(self, version, config):
+        config = dict(config)
+        for key in ("color_on_dark", "color_on_light", "static_color"):
+            if key in config:
+                config[key] = tuple(config[key])
+        if "layers" in config:
+            config["layers"] = tuple(_freeze(layer) for layer in config["layers"] or ())
+        if config.get("animation"):
+            animation = dict(config["animation"])
+            animation["frames"] = tuple(_freeze(f) for f in animation.get("frames") or ())
+            config["animation"] = _freeze(animation)
+        setattr_ = object.__setattr__
+        setattr_(self, "version", version)
+        setattr_(self, "config", MappingProxyType(config))
+        for key, default in self.FIELDS.items():
+            setattr_(self, key, config.get(key, default))
+
+    def layer_configs(self):
+        """One full config dict per layer (empty for a single shape)."""
+        return [dict(self.config, layers=(), **dict(layer)) for layer in self.layers]
+
+    def geometry_layers(self):
+        """The reticle as CompositePlan layer tuples: one per layer, or a
+        single one for a plain shape. The gap only shapes crosses."""
+        configs = [dict(self.FIELDS, **c) for c in self.layer_configs() or [self.config]]
+        return tuple((c["shape"], c["size"], c["thickness"],
+                      c["gap"] if c["shape"] not in ("dot", "circle") else 0,
+                      c.get("dx", 0), c.get("dy", 0))
+                     for c in configs)
+
+    def animation_frames(self):
+        """``geometry_layers`` of every animation keyframe: each frame's
+        overrides applied on top of this snapshot. Frames that change the
+        number of layers are left out, since the color LUTs are per layer."""
+        if not self.animation:
+            return ()
+        count = len(self.layers)
+        frames = []
+        for override in dict(self.animation).get("frames", ()):
+            state = RenderState(self.version, dict(self.config, animation=None, **dict(override)))
+            if len(state.layers) == count:
+                frames.append(state.geometry_layers())
+        return tuple(frames)
+
+    def changed_groups(self, old):
+        """Return the set of GROUPS that differ from snapshot ``old``.
+
+        Everything counts as changed when there is no previous snapshot; a
+        key outside FIELDS changing is treated as a geometry change so it
+        always gets a full rebuild.
+        """
+        if old is None:
+            return set(self.GROUPS)
+        changed = set()
+        for group, keys in self.GROUPS.items():
+            for key in keys:
+                if getattr(self, key) != getattr(old, key):
+                    changed.add(group)
+                    break
+        extra = set(self.config) | set(old.config)
+        extra.difference_update(self.FIELDS)
+        if any(self.config.get(k) != old.config.get(k) for k in extra):
+            changed.add("geometry")
+        return changed
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RenderState is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RenderState is immutable")
+
+
+# Keys a color function never sees: the other groups' and per-layer geometry
+_NON_COLOR_KEYS = frozenset(
+    key for group, keys in RenderState.GROUPS.items() if group != "color" for key in keys
+) | {"layers", "opacity", "dx", "dy"}
+
+
+def _color_params(cfg):
+    """Every color setting in ``cfg`` (including keys unknown to
+    RenderState), over RenderState's color defaults."""
+    params = {key: RenderState.FIELDS[key] for key in RenderState.GROUPS["color"]
+              if key not in _NON_COLOR_KEYS}
+    params.update((key, value) for key, value in _freeze(cfg) if key not in _NON_COLOR_KEYS)
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Render plan
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=ATLAS_CACHE_SIZE)
+def _transparent_frame(stride):
+    """Read-only transparent ``stride×stride`` frame, shared by every plan
+    of that stride so atlas frames don't each carry their own."""
+    return memoryview(bytes(4 * stride * stride)).cast("I")
+
+
+class RenderPlan:
+    """Per-config frame layout: the masked pixels of an ``sz×sz`` mask in a
+    frame widened by ``margin``, as runs, indices and a transparent template."""
+
+    __slots__ = ("sz", "margin", "stride", "mask", "spans", "runs", "index", "template",
+                 "np_index", "_avoid", "_radius", "_source", "_np_source", "_regions",
+                 "_capture")
+
+    def __init__(self, mask, sz, margin=0, radius=1, avoid=None):
+        self.sz = sz
+        self.margin = margin
+        self.stride = stride = sz + 2 * margin
+        self.mask = mask
+        self.spans = mask_spans(mask, sz)
+        self.runs = [((y + margin) * stride + x0 + margin, (y + margin) * stride + x1 + margin)
+                     for y, x0, x1 in self.spans]
+        self.index = array("I")
+        for start, end in self.runs:
+            self.index.extend(range(start, end))
+        self.template = _transparent_frame(stride)
+        self.np_index = None
+        if np is not None:
+            self.np_index = np.asarray(self.index, dtype=np.intp)
+        self._avoid = mask if avoid is None else avoid
+        self._radius = radius
+        self._source = None
+        self._np_source = None
+        self._regions = {}
+        self._capture = {}
+
+    @property
+    def source(self):
+        """Frame index of the clean pixel each masked pixel samples when the
+        overlay is visible in recordings; built on first use."""
+        if self._source is None:
+            self._source = nearest_sources(self._avoid, self.sz, self.index,
+                                           self.margin, self._radius)
+        return self._source
+
+    @property
+    def np_source(self):
+        if self._np_source is None and np is not None:
+            self._np_source = np.asarray(self.source, dtype=np.intp)
+        return self._np_source
+
+    def capture_rects(self, show_cap=False, regions=None):
+        """Frame rectangles a capture must fill, memoized: the masked
+        pixels, their clean sources when ``show_cap``, and the decision
+        windows of ``regions`` when colors are area-averaged."""
+        key = (show_cap, regions)
+        rects = self._capture.get(key)
+        if rects is None:
+            need = bytearray(self.stride * self.stride)
+            self.mark_needed(need, show_cap, regions)
+            rects = self._capture[key] = plan_capture_rects(bytes(need), self.stride)
+        return rects
+
+    def mark_needed(self, need, show_cap=False, regions=None):
+        """Set every pixel of the frame-sized byte map ``need`` that a
+        render with these settings reads."""
+        stride = self.stride
+        for i in self.index:
+            need[i] = 1
+        if show_cap:
+            for i in self.source:
+                need[i] = 1
+        if regions is not None:
+            bx, by = regions.bbox[:2]
+            for x0, y0, x1, y1 in regions.rects:
+                for y in range(by + y0, by + y1):
+                    need[y * stride + bx + x0:y * stride + bx + x1] = b"\x01" * (x1 - x0)
+
+    def regions(self, granularity, block, show_cap=False):
+        """DecisionRegions for ``granularity`` (block | arm), memoized."""
+        key = (granularity, block if granularity == "block" else 0, show_cap)
+        regions = self._regions.get(key)
+        if regions is None:
+            regions = self._regions[key] = DecisionRegions(self, granularity, block, show_cap)
+        return regions
+
+
+class CompositePlan:
+    """Reticle layers compiled into one frame.
+
+    ``layers`` are ``(shape, size, thickness, gap, dx, dy)`` tuples,
+    bottom first. Each layer's mask is centered in a common ``sz×sz``
+    frame, shifted by (dx, dy), and later layers win where they overlap.
+    ``plan`` is the RenderPlan of the merged mask (it sizes the window
+    and the capture). ``plans`` has one RenderPlan per layer over
+    the same frame with just the pixels that layer owns, so each can be
+    recolored by its own ColorLUT (see ``render_composite``). ``sz``
+    optionally makes the frame at least that large, layers centered.
+    """
+
+    __slots__ = ("sz", "plan", "plans", "_capture")
+
+    def __init__(self, layers, margin=0, radius=1, sz=0):
+        sizes = [size | 1 for _, size, _, _, _, _ in layers]  # odd, like a single shape
+        sz = max(sz, self.frame_size(layers)) | 1
+        owner = bytearray(sz * sz)  # 1 + layer number, 0 = unmasked
+        for k, (lsz, (shape, _, thickness, gap, dx, dy)) in enumerate(zip(sizes, layers)):
+            ox, oy = (sz - lsz) // 2 + dx, (sz - lsz) // 2 + dy
+            fill = bytes([k + 1])
+            for y, x0, x1 in mask_spans(build_mask(shape, lsz, thickness, gap), lsz):
+                row = (y + oy) * sz + ox
+                owner[row + x0:row + x1] = fill * (x1 - x0)
+        owner = bytes(owner)
+
+        merged = owner.translate(bytes([0]) + bytes([1]) * 255)
+        self.sz = sz
+        self.plan = RenderPlan(merged, sz, margin, radius)
+        self.plans = tuple(
+            RenderPlan(owner.translate(bytes(k + 1) + b"\x01" + bytes(254 - k)),
+                       sz, margin, radius, avoid=merged)
+            for k in range(len(layers)))
+        self._capture = {}
+
+    @staticmethod
+    def frame_size(layers):
+        """Smallest (odd) frame that holds every layer."""
+        return max((size | 1) + 2 * max(abs(dx), abs(dy))
+                   for _, size, _, _, dx, dy in layers) | 1
+
+    def capture_rects(self, show_cap=False, regions=None):
+        """Frame rectangles a capture must fill for every layer, memoized;
+        ``regions`` is one DecisionRegions (or None) per layer."""
+        key = (show_cap, regions)
+        rects = self._capture.get(key)
+        if rects is None:
+            stride = self.plan.stride
+            need = bytearray(stride * stride)
+            for plan, layer_regions in zip(self.plans, regions or (None,) * len(self.plans)):
+                plan.mark_needed(need, show_cap, layer_regions)
+            rects = self._capture[key] = plan_capture_rects(bytes(need), stride)
+        return rects
+
+
+@functools.lru_cache(maxsize=ATLAS_CACHE_SIZE)
+def build_atlas(frames, margin=0, radius=1):
+    """Every frame of an animation compiled up front, cached.
+
+    ``frames`` is a tuple of ``geometry_layers`` tuples. All frames share
+    the largest frame's size, smaller ones centered, so stepping through
+    them never resizes the window; the render loop only swaps plans.
+    """
+    sz = max(CompositePlan.frame_size(layers) for layers in frames)
+    return tuple(CompositePlan(layers, margin, radius, sz) for layers in frames)
+
+
+@functools.lru_cache(maxsize=16)
+def _sample_offsets(radius):
+    """Neighbour offsets within ``radius``, nearest first. Ties prefer
+    horizontal, then positive, so radius 1 tries right, left, down, up."""
+    r = max(1, radius)
+    offsets = [(dx, dy) for dy in range(-r, r + 1) for dx in range(-r, r + 1)
+               if 0 < dx * dx + dy * dy <= r * r]
+    offsets.sort(key=lambda o: (o[0] * o[0] + o[1] * o[1], abs(o[1]), -o[0], -o[1]))
+    return tuple(offsets)
+
+
+def nearest_sources(mask, sz, index, margin=0, radius=1):
+    """Frame index of the nearest unmasked pixel within ``radius`` of each
+    masked pixel in ``index`` (else the pixel itself).
+
+    Used when the overlay is visible in recordings: the crosshair's own
+    rendered pixels sit under the mask, so reading them back would feed
+    the previous frame into the next one. Pixels in the ``margin`` around
+    the mask are captured background too, so with a margin of at least
+    the radius even the middle of a thick bar finds a clean sample.
+    """
+    stride = sz + 2 * margin
+    lo, hi = -margin, sz + margin
+    offsets = _sample_offsets(radius)
+    sources = array("I")
+    for i in index:
+        x, y = i % stride - margin, i // stride - margin
+        src = i  # fallback: self-sample
+        for dx, dy in offsets:
+            nx, ny = x + dx, y + dy
+            if lo <= nx < hi and lo <= ny < hi:
+                if not (0 <= nx < sz and 0 <= ny < sz) or not mask[ny * sz + nx]:
+                    src = (ny + margin) * stride + nx + margin
+                    break
+        sources.append(src)
+    return sources
+
+
+# ---------------------------------------------------------------------------
+# Area-averaged color decisions
+# ---------------------------------------------------------------------------
+
+class DecisionRegions:
+    """Masked pixels grouped into blocks or arms, each colored from the mean
+    luma of its window; coordinates are local to ``bbox``."""
+
+    __slots__ = ("labels", "rects", "areas", "bbox", "edge_rows", "patch_index", "patch_source",
+                 "np_labels", "np_rects", "np_areas", "np_edge_rows", "np_patch_index",
+                 "np_patch_source")
+
+    def __init__(self, plan, granularity, block, show_cap=False):
+        sz, m, stride = plan.sz, plan.margin, plan.stride
+        c = m + sz // 2
+        ids = {}
+        rects = []
+        labels = array("I")
+        for i in plan.index:
+            x, y = i % stride, i // stride
+            if granularity == "arm":
+                dx, dy = x - c, y - c
+                key = (dx >= 0, 0) if abs(dx) >= abs(dy) else (dy >= 0, 1)
+            else:
+                key = ((x - m) // block, (y - m) // block)
+            rid = ids.get(key)
+            if rid is None:
+                rid = ids[key] = len(rects)
+                if granularity == "arm":
+                    rects.append([x, y, x + 1, y + 1])
+                else:
+                    bx, by = key[0] * block + m, key[1] * block + m
+                    rects.append([bx, by, min(m + sz, bx + block), min(m + sz, by + block)])
+            elif granularity == "arm":
+                r = rects[rid]
+                r[0], r[1] = min(r[0], x), min(r[1], y)
+                r[2], r[3] = max(r[2], x + 1), max(r[3], y + 1)
+            labels.append(rid)
+
+        if rects:
+            bx0, by0 = min(r[0] for r in rects), min(r[1] for r in rects)
+            bx1, by1 = max(r[2] for r in rects), max(r[3] for r in rects)
+            if show_cap:
+                # Clean sources can sit up to the sample radius outside the
+                # windows, further in a composite layer (they avoid every layer)
+                xs = [i % stride for i in plan.source]
+                ys = [i // stride for i in plan.source]
+                bx0, by0 = min(bx0, min(xs)), min(by0, min(ys))
+                bx1, by1 = max(bx1, max(xs) + 1), max(by1, max(ys) + 1)
+        else:
+            bx0 = by0 = bx1 = by1 = 0
+        w = bx1 - bx0
+
+        def local(i):
+            return (i // stride - by0) * w + (i % stride - bx0)
+
+        self.labels = labels
+        self.rects = [(x0 - bx0, y0 - by0, x1 - bx0, y1 - by0) for x0, y0, x1, y1 in rects]
+        self.areas = [(x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects]
+        self.bbox = (bx0, by0, bx1, by1)
+        self.edge_rows = sorted({y for r in self.rects for y in (r[1], r[3])})
+        # Clean-source patches only matter (and sources only get built)
+        # when the overlay is visible in recordings
+        self.patch_index = self.patch_source = None
+        if show_cap:
+            self.patch_index = array("I", map(local, plan.index))
+            self.patch_source = array("I", map(local, plan.source))
+
+        self.np_labels = self.np_rects = self.np_areas = self.np_edge_rows = None
+        self.np_patch_index = self.np_patch_source = None
+        if np is not None:
+            # Rects with their y edges as positions in edge_rows, to index
+            # a table that only holds those rows
+            row_pos = {y: k for k, y in enumerate(self.edge_rows)}
+            self.np_labels = np.asarray(labels, dtype=np.intp)
+            self.np_rects = np.asarray([(x0, row_pos[y0], x1, row_pos[y1])
+                                        for x0, y0, x1, y1 in self.rects],
+                                       dtype=np.intp).reshape(-1, 4)
+            self.np_edge_rows = np.asarray(self.edge_rows, dtype=np.intp)
+            self.np_areas = np.asarray(self.areas, dtype=np.int64)
+            if show_cap:
+                self.np_patch_index = np.asarray(self.patch_index, dtype=np.intp)
+                self.np_patch_source = np.asarray(self.patch_source, dtype=np.intp)
+
+
+_lane_masks = {}
+
+
+def _lane_mask(n):
+    """An int with 0xFF in the low byte of each of ``n`` 32-bit lanes."""
+    m = _lane_masks.get(n)
+    if m is None:
+        if len(_lane_masks) > 16:
+            _lane_masks.clear()
+        m = _lane_masks[n] = int.from_bytes(b"\xff\x00\x00\x00" * n, "little")
+    return m
+
+
+def luma_sat(words, stride, bbox, rows=None, patch=None):
+    """Summed-area table of scaled luma over ``bbox`` of a captured frame
+    ``stride`` pixels wide.
+
+    Returns ``{y: row}`` for every ``y`` in ``rows`` (default: all
+    ``0..h``), where ``row[x]`` is the luma sum over the ``x×y`` pixels
+    above-left of (x, y) — only the rows the windows' edges touch need to
+    be materialized. Everything runs on big ints with one 32-bit lane per
+    pixel: the luma plane is weighted in three whole-box operations and
+    column sums grow one row-add at a time (a lane holds up to ~16800 rows
+    of white, far beyond any reticle). ``patch`` is an ``(index, source)``
+    pair of bbox-local pixels to overwrite first, as render_frame does for
+    show_in_capture.
+    """
+    x0, y0, x1, y1 = bbox
+    w, h = x1 - x0, y1 - y0
+    data = b"".join([words[y * stride + x0:y * stride + x1] for y in range(y0, y1)])
+    n = w * h
+    lane = _lane_mask(n)
+    f = int.from_bytes(data, "little")
+    wr, wg, wb = LUMA_WEIGHTS
+    luma = wb * (f & lane) + wg * ((f >> 8) & lane) + wr * ((f >> 16) & lane)
+    plane = memoryview(bytearray(luma.to_bytes(4 * n, "little")))
+    if patch is not None:
+        view = plane.cast("I")
+        for i, src in zip(*patch):
+            view[i] = view[src]
+        view.release()
+
+    wanted = set(range(h + 1) if rows is None else rows)
+    stride = 4 * w
+    sat = {}
+    col = 0  # per-column sums of the rows above y
+    for y in range(h + 1):
+        if y in wanted:
+            lanes = memoryview(col.to_bytes(stride, "little")).cast("I")
+            sat[y] = list(itertools.accumulate(lanes, initial=0))
+        if y < h:
+            col += int.from_bytes(plane[y * stride:(y + 1) * stride], "little")
+    return sat
+
+
+def recolor_luma_regions(plan, words, lut, show_cap=False):
+    """Adaptive coloring decided per region from the mean luma of its window.
+
+    A region is dark when its window's mean luma is below the threshold,
+    compared exactly in scaled integers (``sum < T * scale * area``), so
+    1×1 blocks reproduce per-pixel coloring.
+    """
+    regions = plan.regions(lut.granularity, lut.block, show_cap)
+    if not regions.rects:
+        return array("I")
+    if np is not None:
+        return recolor_luma_regions_np(plan, regions, words, lut, show_cap)
+    patch = (regions.patch_index, regions.patch_source) if show_cap else None
+    sat = luma_sat(words, plan.stride, regions.bbox, regions.edge_rows, patch)
+    dark, light = lut.palette
+    limit = lut.luma_limit
+    choice = [dark if sat[y1][x1] - sat[y0][x1] - sat[y1][x0] + sat[y0][x0] < limit * area
+              else light
+              for (x0, y0, x1, y1), area in zip(regions.rects, regions.areas)]
+    return array("I", map(choice.__getitem__, regions.labels))
+
+
+def _gather(plan, words, show_cap):
+    """Captured pixels under the mask (or their clean sources), packed in
+    run order into one bytes object."""
+    if show_cap:
+        return array("I", [words[i] for i in plan.source]).tobytes()
+    return b"".join([words[start:end] for start, end in plan.runs])
+
+
+def _scatter(plan, words, out):
+    """Slice the packed words ``out`` back into the runs (NumPy arrays are
+    assigned by index in one go)."""
+    if np is not None and isinstance(out, np.ndarray):
+        np.frombuffer(words, dtype=np.uint32)[plan.np_index] = out
+        return
+    out = memoryview(out)
+    pos = 0
+    for start, end in plan.runs:
+        n = end - start
+        words[start:end] = out[pos:pos + n]
+        pos += n
+
+
+def recolor(plan, words, lut, show_cap=False):
+    """New premultiplied BGRA words for ``plan``'s masked pixels, in
+    ``plan.index`` order, read from the captured frame ``words`` without
+    writing to it. Returns an ``array('I')``-compatible buffer, or a NumPy
+    array when a NumPy kernel ran.
+
+    Constant modes repeat one word. Two-color luma modes sum the integer
+    luma tables and pick one of the two prebuilt words, per pixel or per
+    decision region. Otherwise the exact NumPy kernel is used when
+    available. Without NumPy the masked runs are gathered into one buffer:
+    per-channel modes map it exactly with a single ``bytes.translate`` and
+    stamp the alpha plane over every fourth byte, the rest key it with
+    ``bytes.translate`` (alpha zeroed) and map it through the quantized
+    table at C speed.
+    """
+    if lut.constant is not None:
+        return array("I", [lut.constant]) * len(plan.index)
+
+    if lut.palette is not None:
+        if lut.granularity in ("block", "arm"):
+            return recolor_luma_regions(plan, words, lut, show_cap)
+        if np is not None:
+            return recolor_luma_np(plan, words, lut, show_cap)
+        data = _gather(plan, words, show_cap)
+        dark, light = lut.palette
+        limit = lut.luma_limit
+        lr, lg, lb = LUMA_R, LUMA_G, LUMA_B
+        return array("I", [dark if lr[r] + lg[g] + lb[b] < limit else light
+                           for b, g, r in zip(data[0::4], data[1::4], data[2::4])])
+
+    if np is not None and lut.mode in NP_COLOR_KERNELS:
+        return recolor_np(plan, words, lut, show_cap)
+
+    if lut.byte_table is not None:
+        out = bytearray(_gather(plan, words, show_cap).translate(lut.byte_table))
+        out[3::4] = lut.alpha_plane(len(out) // 4)
+        return memoryview(out).cast("I")
+
+    keys = bytearray(_gather(plan, words, show_cap).translate(lut.qtable))
+    keys[3::4] = bytes(len(keys) // 4)
+    keys = memoryview(keys).cast("I")
+    out = list(map(lut.entries.get, keys))
+    if None in out:
+        fill = lut.fill
+        for j, entry in enumerate(out):
+            if entry is None:
+                out[j] = fill(keys[j])
+    return array("I", out)
+
+
+def render_frame(plan, words, lut, show_cap=False):
+    """Recolor a captured BGRA frame in place according to ``plan``.
+
+    ``words`` is a writable ``stride*stride`` view of 32-bit pixels
+    (normally the surface memory itself) and ``lut`` the ColorLUT of the active color
+    mode. Masked pixels become premultiplied BGRA (see ``recolor``), all
+    others transparent. Constant modes skip the recolor and fill each run
+    with a slice.
+    """
+    if lut.constant is not None:
+        row = memoryview(array("I", [lut.constant]) * plan.sz)
+        words[:] = plan.template
+        for start, end in plan.runs:
+            words[start:end] = row[:end - start]
+        return
+    out = recolor(plan, words, lut, show_cap)
+    words[:] = plan.template
+    _scatter(plan, words, out)
+
+
+def render_composite(composite, words, luts, show_cap=False):
+    """render_frame for a CompositePlan: every layer is recolored by its
+    own ColorLUT from the one captured frame, then the frame is cleared
+    once and each layer's words are sliced into its runs."""
+    outs = [recolor(plan, words, lut, show_cap) for plan, lut in zip(composite.plans, luts)]
+    words[:] = composite.plan.template
+    for plan, out in zip(composite.plans, outs):
+        _scatter(plan, words, out)
+
+
+# ---------------------------------------------------------------------------
+# Frame change detection
+# ---------------------------------------------------------------------------
+
+class ChangeDetector:
+    """Tells the frame loop when recolor + present can be skipped.
+
+    A frame is fingerprinted right after capture (CRC32 of the captured
+    pixels) together with a key identifying the render config. If both
+    match the last *presented* frame, the window already shows the right
+    pixels. ``presented`` must be called once a frame actually reached the
+    screen, so a frame that failed halfway is never treated as shown.
+    """
+
+    __slots__ = ("painted", "skipped", "_last", "_pending")
+
+    def __init__(self):
+        self.painted = 0
+        self.skipped = 0
+        self._last = None
+        self._pending = None
+
+    def unchanged(self, view, key):
+        self._pending = (zlib.crc32(view), key)
+        if self._pending == self._last:
+            self.skipped += 1
+            return True
+        return False
+
+    def presented(self):
+        self._last = self._pending
+        self.painted += 1
+
+    def reset(self):
+        """Forget the last presented frame so the next one always paints."""
+        self._last = None
+
+
+# ---------------------------------------------------------------------------
+# NumPy kernels (optional)
+# ---------------------------------------------------------------------------
+# Vectorized equivalents of the COLOR_MODES functions. Each takes uint8
+# r, g, b arrays plus the mode params and returns (cb, cg, cr) arrays that
+# are byte-identical to calling the scalar function per pixel.
+
+def _np_adaptive(r, g, b, params):
+    luma = (299 * r.astype(np.int64) + 587 * g + 114 * b) // LUMA_SCALE
+    dark = (luma < params["luma_threshold"])[:, None]
+    bgr = np.where(dark, np.asarray(params["color_on_dark"], dtype=np.int64),
+                   np.asarray(params["color_on_light"], dtype=np.int64))
+    return bgr[:, 0], bgr[:, 1], bgr[:, 2]
+
+
+def _np_invert(r, g, b, _params):
+    return 255 - b.astype(np.int64), 255 - g.astype(np.int64), 255 - r.astype(np.int64)
+
+
+def _np_static(r, g, b, params):
+    cb, cg, cr = params["static_color"]
+    n = len(r)
+    return np.full(n, cb, dtype=np.int64), np.full(n, cg, dtype=np.int64), np.full(n, cr, dtype=np.int64)
+
+
+def _np_max_contrast(r, g, b, _params):
+    r_f, g_f, b_f = r / 255.0, g / 255.0, b / 255.0
+    mx = np.maximum(np.maximum(r_f, g_f), b_f)
+    mn = np.minimum(np.minimum(r_f, g_f), b_f)
+    d = mx - mn
+    safe_d = np.where(d == 0, 1.0, d)
+
+    # Hue — same branch order as color_max_contrast
+    h = np.where(mx == r_f, 60.0 * (((g_f - b_f) / safe_d) % 6),
+        np.where(mx == g_f, 60.0 * (((b_f - r_f) / safe_d) + 2),
+                 60.0 * (((r_f - g_f) / safe_d) + 4)))
+    h = np.where(d == 0, 0.0, h)
+    h = (h + 180.0) % 360.0
+
+    # HSV to RGB with S=1, V=1 (so c=1, m=0)
+    x = 1.0 - np.abs((h / 60.0) % 2 - 1.0)
+    zero = np.zeros_like(h)
+    one = np.ones_like(h)
+    sextant = ((h >= 60).astype(np.int64) + (h >= 120) + (h >= 180)
+               + (h >= 240) + (h >= 300))
+    r2 = np.choose(sextant, (one, x, zero, zero, x, one))
+    g2 = np.choose(sextant, (x, one, one, x, zero, zero))
+    b2 = np.choose(sextant, (zero, zero, x, one, one, x))
+    return ((b2 * 255).astype(np.int64), (g2 * 255).astype(np.int64),
+            (r2 * 255).astype(np.int64))
+
+
+NP_COLOR_KERNELS = {
+    "Adaptive": _np_adaptive,
+    "Max Contrast": _np_max_contrast,
+    "Invert": _np_invert,
+    "Static": _np_static,
+}
+
+
+def recolor_np(plan, words, lut, show_cap=False):
+    """Vectorized recolor through the mode's exact NumPy kernel."""
+    frame = np.frombuffer(words, dtype=np.uint32)
+    src = frame[plan.np_source if show_cap else plan.np_index].view(np.uint8).reshape(-1, 4)
+    cb, cg, cr = NP_COLOR_KERNELS[lut.mode](src[:, 2], src[:, 1], src[:, 0], lut.params)
+
+    # Premultiplied alpha, applied in bulk and packed back into words
+    alpha_f = lut.opacity / 255.0
+    return (
+        np.clip(cb * alpha_f, 0, 255).astype(np.uint32)
+        | np.clip(cg * alpha_f, 0, 255).astype(np.uint32) << 8
+        | np.clip(cr * alpha_f, 0, 255).astype(np.uint32) << 16
+        | np.uint32(lut.opacity) << 24
+    )
+
+
+if np is not None:
+    _NP_LUMA = tuple(np.asarray(t, dtype=np.int32) for t in (LUMA_R, LUMA_G, LUMA_B))
+
+
+def recolor_luma_np(plan, words, lut, show_cap=False):
+    """Two-color luma kernel: integer table sums and a select between the
+    two premultiplied palette words."""
+    frame = np.frombuffer(words, dtype=np.uint32)
+    src = frame[plan.np_source if show_cap else plan.np_index].view(np.uint8).reshape(-1, 4)
+    lr, lg, lb = _NP_LUMA
+    luma = lr[src[:, 2]] + lg[src[:, 1]] + lb[src[:, 0]]
+    dark, light = lut.palette
+    return np.where(luma < lut.luma_limit, np.uint32(dark), np.uint32(light))
+
+
+def recolor_luma_regions_np(plan, regions, words, lut, show_cap=False):
+    """Vectorized recolor_luma_regions: column cumsums, then the table rows
+    at the window edges, then fancy-indexed window sums."""
+    stride = plan.stride
+    x0, y0, x1, y1 = regions.bbox
+    frame = np.frombuffer(words, dtype=np.uint32)
+    sub = frame.reshape(stride, stride)[y0:y1, x0:x1]
+    wr, wg, wb = (np.uint32(v) for v in LUMA_WEIGHTS)
+    plane = (sub & 255) * wb + ((sub >> 8) & 255) * wg + ((sub >> 16) & 255) * wr
+    if show_cap:
+        flat = plane.reshape(-1)
+        flat[regions.np_patch_index] = flat[regions.np_patch_source]
+    cols = np.zeros((y1 - y0 + 1, x1 - x0), dtype=np.int64)
+    cols[1:] = plane.cumsum(0, dtype=np.int64)
+    sat = np.zeros((len(regions.np_edge_rows), x1 - x0 + 1), dtype=np.int64)
+    sat[:, 1:] = cols[regions.np_edge_rows].cumsum(1)
+
+    rx0, ry0, rx1, ry1 = regions.np_rects.T
+    sums = sat[ry1, rx1] - sat[ry0, rx1] - sat[ry1, rx0] + sat[ry0, rx0]
+    dark, light = lut.palette
+    choice = np.where(sums < lut.luma_limit * regions.np_areas, np.uint32(dark), np.uint32(light))
+    return choice[regions.np_labels]
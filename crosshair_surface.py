@@ -0,0 +1,430 @@
+"""
+Capture/present surfaces — the long-lived pixel buffers the overlay captures
+the screen into and presents from, plus the small backend interface that
+owns them. The Win32 GDI backend lives in crosshair_overlay; the in-memory
+backend here stands in for it on any platform.
+"""
+
+import threading
+import time
+
+from crosshair_timing import FrameScheduler
+
+
+class Surface:
+    """One ``sz×sz`` (or ``sz×height``) 32-bit BGRA surface owned by a backend.
+
+    ``handle`` is backend-private (GDI handles, a bytearray, ...).
+    ``view`` (bytes) and ``words`` (32-bit pixels) are zero-copy views of
+    the pixel memory, valid only until ``release``. Releasing them makes
+    any reference that outlived the surface raise ValueError instead of
+    touching freed memory.
+    """
+
+    __slots__ = ("sz", "height", "handle", "view", "words")
+
+    def __init__(self, sz, handle, buffer, height=None):
+        self.sz = sz
+        self.height = sz if height is None else height
+        self.handle = handle
+        self.view = memoryview(buffer).cast("B")
+        self.words = self.view.cast("I")
+
+    @property
+    def alive(self):
+        return self.view is not None
+
+    def release(self):
+        """Invalidate the pixel views; call before freeing the memory."""
+        if self.view is not None:
+            self.words.release()
+            self.view.release()
+            self.words = self.view = None
+
+
+class SurfaceBackend:
+    """Interface between the overlay and whatever provides its pixels."""
+
+    def create(self, sz, height=None):
+        """Allocate and return a new Surface of ``sz×sz`` pixels (``sz``
+        wide and ``height`` tall when given)."""
+        raise NotImplementedError
+
+    def destroy(self, surface):
+        """Free everything ``create`` allocated for ``surface``."""
+        raise NotImplementedError
+
+    def capture(self, surface, x, y, rects=None):
+        """Copy the screen region at (x, y) into ``surface``.
+
+        ``rects`` optionally limits the copy to ``(rx, ry, w, h)``
+        rectangles of the surface (see ``plan_capture_rects``); pixels
+        outside them are left untouched.
+        """
+        raise NotImplementedError
+
+    def present(self, surface, hwnd, x, y, src=None):
+        """Show ``surface`` in the layered window ``hwnd`` at (x, y).
+
+        ``src`` is an optional ``(sx, sy, w, h)`` sub-rectangle of the
+        surface to show instead of all of it (e.g. when capture was
+        widened by a margin the window does not cover).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release backend-wide resources (e.g. the screen DC)."""
+
+
+class SurfacePool:
+    """Keeps one surface alive across frames.
+
+    The surface is recreated only when the requested size changes or the
+    pool is invalidated (display mode change); every other frame reuses it.
+    Counters make the acquire/reuse/release behaviour observable.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._surface = None
+        self._stale = False
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+
+    def acquire(self, sz):
+        surface = self._surface
+        if surface is not None and surface.sz == sz and not self._stale:
+            self.reused += 1
+            return surface
+        self.release()
+        self._surface = self.backend.create(sz)
+        self._stale = False
+        self.created += 1
+        return self._surface
+
+    def invalidate(self):
+        """Force the next acquire to build a fresh surface."""
+        self._stale = True
+
+    def release(self):
+        if self._surface is not None:
+            surface, self._surface = self._surface, None
+            self.backend.destroy(surface)
+            self.released += 1
+
+    def close(self):
+        self.release()
+        self.backend.close()
+
+
+class MemoryBackend(SurfaceBackend):
+    """Headless stand-in backed by plain bytearrays.
+
+    ``screen`` is a callable ``(x, y, sz) -> bytes`` that produces the
+    captured pixels (defaults to black). With ``record`` set, presented
+    frames are kept in ``presented`` as ``(hwnd, x, y, bytes)`` tuples,
+    cropped to ``src`` when one is given.
+    """
+
+    def __init__(self, screen=None, record=True):
+        self.screen = screen or (lambda x, y, sz: bytes(sz * sz * 4))
+        self.record = record
+        self.live = 0
+        self.captures = 0
+        self.presents = 0
+        self.presented = []
+        self.closed = False
+
+    def create(self, sz, height=None):
+        self.live += 1
+        buf = bytearray(sz * (sz if height is None else height) * 4)
+        return Surface(sz, buf, buf, height)
+
+    def destroy(self, surface):
+        self.live -= 1
+        surface.release()
+        surface.handle = None
+
+    def capture(self, surface, x, y, rects=None):
+        self.captures += 1
+        if rects is None:
+            if surface.height == surface.sz:
+                surface.view[:] = self.screen(x, y, surface.sz)
+                return
+            rects = ((0, 0, surface.sz, surface.height),)
+        sz = surface.sz
+        n = max(sz, surface.height)
+        screen = memoryview(self.screen(x, y, n)).cast("I")
+        words = surface.words
+        for rx, ry, w, h in rects:
+            for row in range(ry, ry + h):
+                words[row * sz + rx:row * sz + rx + w] = screen[row * n + rx:row * n + rx + w]
+
+    def present(self, surface, hwnd, x, y, src=None):
+        self.presents += 1
+        if self.record:
+            if src is None:
+                pixels = bytes(surface.view)
+            else:
+                sx, sy, w, h = src
+                words, sz = surface.words, surface.sz
+                pixels = b"".join([words[(sy + r) * sz + sx:(sy + r) * sz + sx + w]
+                                   for r in range(h)])
+            self.presented.append((hwnd, x, y, pixels))
+
+    def close(self):
+        self.closed = True
+
+
+class CapturedFrame:
+    """A surface filled by ``CapturePipeline`` for one ``target``.
+
+    ``started``/``captured`` are clock readings taken around the capture,
+    so the consumer can measure end-to-end latency up to its present.
+    """
+
+    __slots__ = ("surface", "target", "started", "captured")
+
+    def __init__(self, surface, target, started, captured):
+        self.surface = surface
+        self.target = target
+        self.started = started
+        self.captured = captured
+
+
+class CapturePipeline:
+    """Captures frame N+1 on a worker thread while the caller processes
+    and presents frame N.
+
+    The worker paces itself with a FrameScheduler and, at every deadline,
+    captures ``target`` — a ``(sz, x, y, rects)`` tuple set with ``aim``,
+    or None to pause — into one of ``buffers`` surfaces. The hand-off is a
+    single slot with a latest-wins policy: a captured frame nobody took
+    before the next one finished is recycled and counted in ``dropped``,
+    so ``take`` always returns the freshest pixels and the consumer never
+    works through a backlog. The caller owns a taken frame until it hands
+    it back with ``release``.
+
+    With two buffers one is always free for the worker: the consumer
+    holds at most one, and an untaken frame is the one recycled.
+    """
+
+    def __init__(self, backend, interval, buffers=2, clock=time.perf_counter,
+                 sleep=time.sleep):
+        self.backend = backend
+        self.clock = clock
+        self.scheduler = FrameScheduler(interval, clock=clock, sleep=sleep)
+        self.buffers = buffers
+        self._cond = threading.Condition()
+        self._target = None
+        self._ready = None     # newest captured frame not yet taken
+        self._free = []        # surfaces neither captured into nor held
+        self._live = 0         # surfaces currently allocated
+        self._thread = None
+        self._running = False
+        self.captured = 0
+        self.taken = 0
+        self.dropped = 0       # captured frames superseded before anyone took them
+        self.stalls = 0        # takes that had to wait for the worker
+        self.errors = 0
+
+    @property
+    def interval(self):
+        return self.scheduler.interval
+
+    @interval.setter
+    def interval(self, seconds):
+        self.scheduler.interval = seconds
+
+    @property
+    def depth(self):
+        """Captured frames waiting to be taken (0 or 1)."""
+        return 0 if self._ready is None else 1
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker and free every surface not held by the caller."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=3)
+            self._thread = None
+        with self._cond:
+            if self._ready is not None:
+                self._free.append(self._ready.surface)
+                self._ready = None
+            for surface in self._free:
+                self._destroy(surface)
+            self._free = []
+
+    def aim(self, target):
+        """Capture ``target`` from the next deadline on (None pauses)."""
+        with self._cond:
+            if target != self._target:
+                if (target is None) != (self._target is None):
+                    self.scheduler.reset()  # pause/resume; a moving target keeps the pace
+                self._target = target
+                self._cond.notify_all()
+
+    def take(self, timeout=None):
+        """Return the newest captured frame, waiting up to ``timeout``
+        seconds for one. Returns None on timeout or when stopped."""
+        with self._cond:
+            if self._ready is None:
+                self.stalls += 1
+                self._cond.wait_for(lambda: self._ready is not None or not self._running,
+                                    timeout)
+            frame, self._ready = self._ready, None
+            if frame is not None:
+                self.taken += 1
+            return frame
+
+    def release(self, frame):
+        """Hand a taken frame's surface back for the worker to reuse."""
+        with self._cond:
+            target = self._target
+            if self._running and target is not None and frame.surface.sz == target[0]:
+                self._free.append(frame.surface)
+            else:
+                self._destroy(frame.surface)
+
+    # ---- worker ----
+
+    def _destroy(self, surface):
+        self._live -= 1
+        self.backend.destroy(surface)
+
+    def _checkout(self, sz):
+        """A surface of ``sz`` for the worker; called with the lock held."""
+        free = self._free
+        while free:
+            surface = free.pop()
+            if surface.sz == sz:
+                return surface
+            self._destroy(surface)
+        if self._live < self.buffers or self._ready is None:
+            self._live += 1
+            return self.backend.create(sz)
+        # Every buffer is busy: the untaken frame is stale, capture over it
+        frame, self._ready = self._ready, None
+        self.dropped += 1
+        if frame.surface.sz == sz:
+            return frame.surface
+        self._destroy(frame.surface)
+        self._live += 1
+        return self.backend.create(sz)
+
+    def _worker(self):
+        clock = self.clock
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._target is not None or not self._running)
+                if not self._running:
+                    return
+                target = self._target
+                surface = self._checkout(target[0])
+            started = clock()
+            try:
+                self.backend.capture(surface, target[1], target[2], target[3])
+            except Exception:
+                self.errors += 1
+                with self._cond:
+                    self._free.append(surface)
+            else:
+                frame = CapturedFrame(surface, target, started, clock())
+                with self._cond:
+                    if self._ready is not None:
+                        self._free.append(self._ready.surface)
+                        self.dropped += 1
+                    self._ready = frame
+                    self.captured += 1
+                    self._cond.notify_all()
+            self.scheduler.wait()
+
+
+class SharedCaptureBackend(SurfaceBackend):
+    """Serves several overlays' captures from one screen capture.
+
+    ``grab`` copies the union rectangle of every overlay's capture region
+    from the screen once per tick; ``capture`` then fills an overlay's
+    surface from that copy instead of the screen, falling back to
+    ``backend`` for anything the grab did not cover. Surfaces are created,
+    presented and destroyed by ``backend`` as usual.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._union = None      # surface holding the last grab
+        self._grabbed = None    # its (x, y, w, h) in screen coordinates
+        self.grabs = 0
+        self.captures = 0
+        self.misses = 0         # rectangles a grab did not cover
+
+    def grab(self, x, y, w, h):
+        """Capture the screen rectangle (x, y, w, h) for this tick."""
+        union = self._union
+        if union is None or union.sz < w or union.height < h:
+            width, height = w, h
+            if union is not None:
+                # Grow to fit, never shrink: the union moves with the overlays
+                width, height = max(w, union.sz), max(h, union.height)
+                self.backend.destroy(union)
+            union = self._union = self.backend.create(width, height)
+        self.backend.capture(union, x, y, ((0, 0, w, h),))
+        self._grabbed = (x, y, w, h)
+        self.grabs += 1
+
+    def skip(self):
+        """No shared grab this tick: captures go straight to the screen."""
+        self._grabbed = None
+
+    def create(self, sz, height=None):
+        return self.backend.create(sz, height)
+
+    def destroy(self, surface):
+        self.backend.destroy(surface)
+
+    def capture(self, surface, x, y, rects=None):
+        self.captures += 1
+        sz = surface.sz
+        if rects is None:
+            rects = ((0, 0, sz, sz),)
+        grabbed = self._grabbed
+        if grabbed is None:
+            self.backend.capture(surface, x, y, rects)
+            return
+        gx, gy, gw, gh = grabbed
+        src, stride = self._union.words, self._union.sz
+        words = surface.words
+        ox, oy = x - gx, y - gy
+        for rx, ry, w, h in rects:
+            if ox + rx < 0 or oy + ry < 0 or ox + rx + w > gw or oy + ry + h > gh:
+                self.misses += 1
+                self.backend.capture(surface, x, y, ((rx, ry, w, h),))
+                continue
+            s = (oy + ry) * stride + ox + rx
+            for d in range(ry * sz + rx, (ry + h) * sz + rx, sz):
+                words[d:d + w] = src[s:s + w]
+                s += stride
+
+    def present(self, surface, hwnd, x, y, src=None):
+        self.backend.present(surface, hwnd, x, y, src)
+
+    def release(self):
+        """Free the grab surface (the wrapped backend stays open)."""
+        if self._union is not None:
+            self.backend.destroy(self._union)
+            self._union = None
+        self._grabbed = None
+
+    def close(self):
+        self.release()
+        self.backend.close()
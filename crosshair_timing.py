@@ -0,0 +1,264 @@
+"""
+Frame pacing for the overlay render loop. Pure Python: the clock and the
+sleep primitive are injectable, so pacing can be checked headless with a
+fake clock while the overlay plugs in a high-resolution Win32 timer.
+"""
+
+import time
+from array import array
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (0 < pct <= 100)."""
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, -(-len(ordered) * pct // 100) - 1))
+    return ordered[int(k)]
+
+
+class FrameScheduler:
+    """Paces frames on absolute deadlines.
+
+    Every frame is due exactly ``interval`` seconds after the previous
+    deadline, so time spent painting is absorbed instead of being added on
+    top of the sleep. When a frame runs late by more than one interval,
+    the deadlines already missed are dropped (counted in ``dropped``)
+    rather than replayed as a burst.
+    """
+
+    def __init__(self, interval, clock=time.perf_counter, sleep=time.sleep):
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.frames = 0
+        self.dropped = 0
+        self.last_overshoot = 0.0
+
+    def reset(self):
+        """Restart pacing from "now" (e.g. after a long pause)."""
+        self.deadline = None
+
+    def wait(self):
+        """Block until the next frame deadline.
+
+        Returns how late the wake-up was relative to the deadline, in
+        seconds (0.0 if no sleep was needed).
+        """
+        now = self.clock()
+        interval = self.interval
+        if self.deadline is None:
+            self.deadline = now
+        due = self.deadline + interval
+        self.frames += 1
+
+        if now >= due:
+            # Behind: run right away, skipping every deadline that has passed
+            # except the one this frame stands for; stay phase-aligned.
+            missed = int((now - due) // interval) if interval > 0 else 0
+            self.dropped += missed
+            self.deadline = due + missed * interval
+            self.last_overshoot = 0.0
+            return 0.0
+
+        self.deadline = due
+        self.sleep(due - now)
+        self.last_overshoot = max(0.0, self.clock() - due)
+        return self.last_overshoot
+
+
+class AdaptiveRate:
+    """Picks the frame interval from how busy the background is.
+
+    Runs at ``fast`` while the captured region keeps changing. After
+    ``idle_after`` consecutive unchanged frames the interval grows by
+    ``ramp`` per frame until it reaches ``slow``; the first changed frame
+    snaps straight back to ``fast``.
+    """
+
+    def __init__(self, fast, slow, idle_after=30, ramp=1.25):
+        self.interval = fast
+        self.unchanged = 0
+        self.configure(fast, slow, idle_after, ramp)
+
+    def configure(self, fast, slow, idle_after=None, ramp=None):
+        self.fast = fast
+        self.slow = max(fast, slow)
+        if idle_after is not None:
+            self.idle_after = idle_after
+        if ramp is not None:
+            self.ramp = ramp
+        self.interval = min(max(self.interval, self.fast), self.slow)
+
+    def update(self, changed):
+        """Record one frame; returns the interval to use for the next one."""
+        if changed:
+            self.unchanged = 0
+            self.interval = self.fast
+        else:
+            self.unchanged += 1
+            if self.unchanged > self.idle_after:
+                self.interval = min(self.slow, self.interval * self.ramp)
+        return self.interval
+
+
+class AnimationClock:
+    """Picks the animation frame to show from the time.
+
+    ``loop`` plays frames 0..count-1 over and over, ``pingpong`` plays
+    them forward then backward, and ``hold`` runs toward the last frame
+    while ``held`` is true and back toward the first when it is not
+    (e.g. a gap that opens while a key is down). The clock is injectable
+    like FrameScheduler's.
+    """
+
+    MODES = ("loop", "pingpong", "hold")
+
+    def __init__(self, count, fps, mode="loop", clock=time.perf_counter):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown animation mode {mode!r}")
+        self.count = max(1, count)
+        self.fps = fps
+        self.mode = mode
+        self.clock = clock
+        self.start = clock()
+        self._pos = 0.0   # hold mode: fractional frame position
+        self._last = self.start
+        self._held = False
+
+    def index(self, held=False):
+        """Frame to show now."""
+        now = self.clock()
+        last = self.count - 1
+        if self.mode == "hold":
+            if self.settled(self._held):
+                # Resting at an end since the last call (the loop may have
+                # been parked): that time does not count, start from rest
+                self._last = now
+            self._held = held
+            step = max(0.0, now - self._last) * self.fps
+            self._last = now
+            self._pos = min(last, self._pos + step) if held else max(0.0, self._pos - step)
+            return int(self._pos)
+        k = int((now - self.start) * self.fps)
+        if self.mode == "loop" or last == 0:
+            return k % self.count
+        k %= 2 * last
+        return k if k <= last else 2 * last - k
+
+    def settled(self, held=False):
+        """True when the frame cannot change until ``held`` does: a hold
+        animation resting at either end. Looping animations never settle."""
+        if self.mode != "hold":
+            return self.count == 1
+        return self._pos >= self.count - 1 if held else self._pos <= 0.0
+
+
+class PositionFeed:
+    """Polls an external position source once per frame.
+
+    ``source`` is a callable returning the crosshair center ``(x, y)`` in
+    screen pixels, or None when it has nothing new, or an iterator of such
+    positions (exhausted counts as None). With ``predict`` a fresh sample
+    is extrapolated ``lead`` seconds (at most ``max_lead``) ahead along the
+    velocity from the previous one; a poll with no new sample means the
+    target has not moved, so it shows the last sample as is.
+    """
+
+    def __init__(self, source, predict=False, max_lead=0.05, clock=time.perf_counter):
+        if callable(source):
+            self._read = source
+        else:
+            it = iter(source)
+            self._read = lambda: next(it, None)
+        self.predict = predict
+        self.max_lead = max_lead
+        self.clock = clock
+        self.samples = 0
+        self._last = None          # (t, x, y) of the newest sample
+        self._velocity = (0.0, 0.0)
+
+    def poll(self, lead=0.0):
+        """Position to show now, in whole pixels; None until the source
+        has produced one."""
+        now = self.clock()
+        pos = self._read()
+        if pos is None:
+            self._velocity = (0.0, 0.0)  # nothing new: the target stayed put
+        else:
+            x, y = pos
+            if self._last is not None:
+                t0, x0, y0 = self._last
+                if now > t0:
+                    self._velocity = ((x - x0) / (now - t0), (y - y0) / (now - t0))
+            self._last = (now, x, y)
+            self.samples += 1
+        if self._last is None:
+            return None
+        _, x, y = self._last
+        if self.predict:
+            ahead = min(self.max_lead, lead)
+            vx, vy = self._velocity
+            x += vx * ahead
+            y += vy * ahead
+        return round(x), round(y)
+
+
+class FrameTelemetry:
+    """Fixed-size ring buffer of per-frame stage timings.
+
+    Written only by the render thread and read by anyone: each frame is
+    written into its slot before the frame counter is bumped, so readers
+    never need a lock (a reader racing the writer sees at worst one slot
+    from the frame being recorded). Times are in seconds; ``latency`` is
+    end to end, from the start of the capture a frame was built from to
+    the end of its present.
+    """
+
+    STAGES = ("capture", "process", "present", "overshoot", "latency")
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self._starts = array("d", [0.0]) * capacity
+        self._stages = {name: array("d", [0.0]) * capacity for name in self.STAGES}
+        self.frames = 0
+        self.exceptions = 0
+        self.lock_misses = 0
+
+    def record(self, start, capture, process, present, overshoot, latency=0.0):
+        i = self.frames % self.capacity
+        self._starts[i] = start
+        stages = self._stages
+        stages["capture"][i] = capture
+        stages["process"][i] = process
+        stages["present"][i] = present
+        stages["overshoot"][i] = overshoot
+        stages["latency"][i] = latency
+        self.frames += 1  # publish
+
+    def stats(self):
+        """Percentiles (ms) per stage and for the whole frame cost, plus
+        achieved FPS over the frames currently in the buffer."""
+        n = min(self.frames, self.capacity)
+        result = {
+            "frames": self.frames,
+            "exceptions": self.exceptions,
+            "lock_misses": self.lock_misses,
+            "fps": 0.0,
+        }
+        if n == 0:
+            return result
+        cols = {name: list(buf[:n]) for name, buf in self._stages.items()}
+        cols["frame_cost"] = [c + p + q for c, p, q in
+                              zip(cols["capture"], cols["process"], cols["present"])]
+        for name, values in cols.items():
+            ms = [v * 1000.0 for v in values]
+            result[name] = {
+                "p50_ms": percentile(ms, 50),
+                "p90_ms": percentile(ms, 90),
+                "p99_ms": percentile(ms, 99),
+                "max_ms": max(ms),
+            }
+        starts = sorted(self._starts[:n])
+        if n > 1 and starts[-1] > starts[0]:
+            result["fps"] = (n - 1) / (starts[-1] - starts[0])
+        return result
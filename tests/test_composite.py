@@ -0,0 +1,42 @@
+"""Composite reticles with area-averaged Adaptive layers."""
+
+import random
+
+import pytest
+
+import crosshair_render
+from crosshair_render import CompositePlan, get_color_lut, render_composite
+
+LAYERS = (("cross", 31, 5, 0, 0, 0), ("dot", 31, 3, 0, 0, 0))
+
+
+def frame(stride, seed):
+    rnd = random.Random(seed)
+    return rnd.randbytes(stride * stride * 4)
+
+
+def render(composite, pixels, luts, show_cap):
+    words = memoryview(bytearray(pixels)).cast("I")
+    render_composite(composite, words, luts, show_cap)
+    return words.tolist()
+
+
+@pytest.mark.parametrize("show_cap", (False, True))
+@pytest.mark.parametrize("granularity", ("arm", "block"))
+def test_layer_regions_cover_clean_sources(monkeypatch, granularity, show_cap):
+    # A layer's clean sources avoid the merged mask, so they can lie well
+    # outside that layer's own decision windows
+    margin = 4 if show_cap else 0
+    composite = CompositePlan(LAYERS, margin, radius=4)
+    lut = get_color_lut({"color_mode": "Adaptive", "color_granularity": granularity,
+                         "granularity_block": 4}, 255)
+    luts = (lut, lut)
+    regions = tuple(plan.regions(granularity, 4, show_cap) for plan in composite.plans)
+    assert composite.capture_rects(show_cap, regions)
+
+    pixels = frame(composite.plan.stride, 7)
+    out = render(composite, pixels, luts, show_cap)
+    assert sum(1 for w in out if w) == len(composite.plan.index)
+    if crosshair_render.np is not None:
+        monkeypatch.setattr(crosshair_render, "np", None)
+        assert render(composite, pixels, luts, show_cap) == out
@@ -0,0 +1,81 @@
+"""The span-based mask builders against the original per-pixel scans."""
+
+import math
+
+import pytest
+
+from crosshair_render import build_circle_mask, build_cross_mask, build_dot_mask, build_mask
+
+SIZES = tuple(range(1, 60)) + (101, 201, 333)
+THICKNESSES = tuple(range(12))
+GAPS = (-3, -1, 0, 1, 2, 5, 40)
+
+
+def reference_cross(sz, thickness, gap=0):
+    center = sz // 2
+    half_t = thickness // 2
+    half_g = gap
+    mask = bytearray(sz * sz)
+    for y in range(sz):
+        for x in range(sz):
+            if (center - half_t) <= x < (center - half_t + thickness):
+                if not ((center - half_g) <= y <= (center + half_g)):
+                    mask[y * sz + x] = 1
+            if (center - half_t) <= y < (center - half_t + thickness):
+                if not ((center - half_g) <= x <= (center + half_g)):
+                    mask[y * sz + x] = 1
+    return bytes(mask)
+
+
+def reference_dot(sz, thickness):
+    center = sz // 2
+    half_t = max(1, thickness) // 2
+    t = max(1, thickness)
+    mask = bytearray(sz * sz)
+    for y in range(sz):
+        for x in range(sz):
+            if (center - half_t) <= x < (center - half_t + t):
+                if (center - half_t) <= y < (center - half_t + t):
+                    mask[y * sz + x] = 1
+    return bytes(mask)
+
+
+def reference_circle(sz, thickness):
+    center = sz / 2.0 - 0.5
+    r_outer = sz / 2.0 - 0.5
+    r_inner = max(0, r_outer - thickness)
+    mask = bytearray(sz * sz)
+    for y in range(sz):
+        for x in range(sz):
+            d = math.sqrt((x - center) ** 2 + (y - center) ** 2)
+            if r_inner <= d <= r_outer:
+                mask[y * sz + x] = 1
+    return bytes(mask)
+
+
+@pytest.mark.parametrize("sz", SIZES)
+def test_cross(sz):
+    for thickness in THICKNESSES:
+        for gap in GAPS:
+            assert build_cross_mask(sz, thickness, gap) == reference_cross(sz, thickness, gap), \
+                (thickness, gap)
+
+
+@pytest.mark.parametrize("sz", SIZES)
+def test_dot(sz):
+    for thickness in THICKNESSES:
+        assert build_dot_mask(sz, thickness) == reference_dot(sz, thickness), thickness
+
+
+@pytest.mark.parametrize("sz", SIZES)
+def test_circle(sz):
+    for thickness in THICKNESSES:
+        assert build_circle_mask(sz, thickness) == reference_circle(sz, thickness), thickness
+
+
+def test_build_mask_dispatches_and_caches():
+    assert build_mask("dot", 15, 3) == reference_dot(15, 3)
+    assert build_mask("circle", 15, 3) == reference_circle(15, 3)
+    assert build_mask("cross", 15, 3, 2) == reference_cross(15, 3, 2)
+    assert build_mask("unknown", 15, 3, 2) == reference_cross(15, 3, 2)
+    assert build_mask("circle", 15, 3) is build_mask("circle", 15, 3)
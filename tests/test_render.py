@@ -0,0 +1,175 @@
+"""render_frame against a per-pixel reference, with and without NumPy, and
+the capture rectangle planner."""
+
+import random
+
+import pytest
+
+import crosshair_render
+from crosshair_render import (
+    COLOR_MODES, RenderPlan, build_mask, get_color_lut, plan_capture_rects, render_frame,
+    _premultiply,
+)
+
+CONFIG = {
+    "color_on_dark": (0, 255, 0),
+    "color_on_light": (255, 0, 255),
+    "luma_threshold": 128,
+    "static_color": (12, 200, 77),
+}
+SHAPES = (("cross", 21, 3, 2), ("dot", 9, 5, 0), ("circle", 31, 4, 0))
+OPACITIES = (255, 200, 128, 1)
+
+
+def captured(stride, seed):
+    rnd = random.Random(seed)
+    return memoryview(bytearray(rnd.randbytes(stride * stride * 4))).cast("I")
+
+
+def reference(plan, frame, lut, show_cap, exact):
+    """Expected frame, one pixel at a time: the color function itself when
+    ``exact``, else the quantized table."""
+    fn = COLOR_MODES[lut.mode]
+    cfg = dict(CONFIG, color_mode=lut.mode)
+    out = [0] * len(frame)
+    for i, src in zip(plan.index, plan.source if show_cap else plan.index):
+        word = frame[src]
+        if exact:
+            b, g, r = word & 255, (word >> 8) & 255, (word >> 16) & 255
+            out[i] = _premultiply(fn(r, g, b, cfg), lut.opacity)
+        else:
+            out[i] = lut.lookup(word)
+    return out
+
+
+def rendered(plan, frame, lut, show_cap):
+    words = memoryview(bytearray(frame.tobytes())).cast("I")
+    render_frame(plan, words, lut, show_cap)
+    return words.tolist()
+
+
+def cases():
+    for shape, sz, thickness, gap in SHAPES:
+        for show_cap in (False, True):
+            margin = 2 if show_cap else 0
+            plan = RenderPlan(build_mask(shape, sz, thickness, gap), sz, margin, 2)
+            yield plan, show_cap
+
+
+@pytest.mark.parametrize("opacity", OPACITIES)
+@pytest.mark.parametrize("mode", sorted(COLOR_MODES))
+def test_numpy_kernels_match_color_functions(mode, opacity):
+    if crosshair_render.np is None:
+        pytest.skip("NumPy not installed")
+    lut = get_color_lut(dict(CONFIG, color_mode=mode), opacity)
+    for seed, (plan, show_cap) in enumerate(cases()):
+        frame = captured(plan.stride, seed)
+        assert rendered(plan, frame, lut, show_cap) == reference(plan, frame, lut, show_cap, True)
+
+
+@pytest.mark.parametrize("opacity", OPACITIES)
+@pytest.mark.parametrize("mode", sorted(COLOR_MODES))
+def test_pure_python_matches_reference(monkeypatch, mode, opacity):
+    monkeypatch.setattr(crosshair_render, "np", None)
+    lut = get_color_lut(dict(CONFIG, color_mode=mode), opacity)
+    # Modes without an exact table go through the quantized one
+    exact = lut.constant is not None or lut.byte_table is not None or lut.palette is not None
+    for seed, (plan, show_cap) in enumerate(cases()):
+        frame = captured(plan.stride, seed)
+        assert rendered(plan, frame, lut, show_cap) == reference(plan, frame, lut, show_cap, exact)
+
+
+@pytest.mark.parametrize("granularity", ("block", "arm"))
+def test_region_decisions_match_without_numpy(monkeypatch, granularity):
+    if crosshair_render.np is None:
+        pytest.skip("NumPy not installed")
+    lut = get_color_lut(dict(CONFIG, color_mode="Adaptive", color_granularity=granularity,
+                             granularity_block=4), 255)
+    for seed, (plan, show_cap) in enumerate(cases()):
+        frame = captured(plan.stride, seed)
+        vectorized = rendered(plan, frame, lut, show_cap)
+        with monkeypatch.context() as m:
+            m.setattr(crosshair_render, "np", None)
+            assert rendered(plan, frame, lut, show_cap) == vectorized
+
+
+def test_table_keys_ignore_alpha():
+    lut = get_color_lut(dict(CONFIG, color_mode="Max Contrast"), 77)
+    lut.entries.clear()
+    words = [alpha << 24 | 0x123456 for alpha in range(256)]
+    assert len({lut.lookup(word) for word in words}) == 1
+    assert len(lut.entries) == 1
+
+
+# ---------------------------------------------------------------------------
+# Capture rectangles
+# ---------------------------------------------------------------------------
+
+def covered(rects, width):
+    hit = bytearray(width * width)
+    for x, y, w, h in rects:
+        assert w > 0 and h > 0
+        assert 0 <= x and x + w <= width and 0 <= y and y + h <= width
+        for row in range(y, y + h):
+            hit[row * width + x:row * width + x + w] = b"\x01" * w
+    return hit
+
+
+def random_need(width, seed):
+    rnd = random.Random(seed)
+    need = bytearray(width * width)
+    for _ in range(rnd.randrange(1, 12)):
+        x, y = rnd.randrange(width), rnd.randrange(width)
+        w, h = rnd.randrange(1, width - x + 1), rnd.randrange(1, width - y + 1)
+        for row in range(y, y + h):
+            need[row * width + x:row * width + x + w] = b"\x01" * w
+    for _ in range(rnd.randrange(20)):
+        need[rnd.randrange(width * width)] = 1
+    return bytes(need)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_capture_rects_cover_need_within_bounds(seed):
+    width = random.Random(seed).choice((7, 31, 64, 129))
+    need = random_need(width, seed)
+    for rect_cost, max_bands in ((0, 48), (1024, 48), (1024, 4), (50, 2)):
+        rects = plan_capture_rects(need, width, rect_cost, max_bands)
+        hit = covered(rects, width)
+        assert all(hit[i] for i, n in enumerate(need) if n)
+        assert len({(y, h) for _, y, _, h in rects}) <= max_bands
+
+
+def test_capture_rects_band_limit_on_a_noisy_mask():
+    rnd = random.Random(3)
+    width = 200
+    need = bytes(rnd.random() < 0.02 for _ in range(width * width))
+    rects = plan_capture_rects(need, width, max_bands=16)
+    assert len({(y, h) for _, y, _, h in rects}) <= 16
+    hit = covered(rects, width)
+    assert all(hit[i] for i, n in enumerate(need) if n)
+
+
+def test_capture_rects_empty():
+    assert plan_capture_rects(bytes(15 * 15), 15) == []
+
+
+def test_capture_rects_shapes():
+    # A cross: the upper arm, the full-width bar, the lower arm
+    assert plan_capture_rects(build_mask("cross", 61, 3, 2), 61) == [
+        (29, 0, 3, 28), (0, 29, 61, 3), (29, 33, 3, 28)]
+    # A dot: one square
+    assert plan_capture_rects(build_mask("dot", 31, 7), 31) == [(12, 12, 7, 7)]
+    # A ring: several bands hugging the annulus, never the hole in the middle
+    sz = 501
+    mask = build_mask("circle", sz, 9)
+    rects = plan_capture_rects(mask, sz)
+    assert len({(y, h) for _, y, _, h in rects}) > 3
+    assert not covered(rects, sz)[sz // 2 * sz + sz // 2]
+    assert sum(w * h for _, _, w, h in rects) < sz * sz // 4
+
+
+def test_capture_rects_without_blit_cost_are_exact():
+    mask = build_mask("cross", 41, 5, 3)
+    rects = plan_capture_rects(mask, 41, rect_cost=0)
+    assert sum(w * h for _, _, w, h in rects) == sum(mask)
+    assert covered(rects, 41) == bytearray(mask)
@@ -0,0 +1,118 @@
+"""SurfacePool, CapturePipeline and SharedCaptureBackend over the in-memory
+backend."""
+
+from array import array
+
+from crosshair_surface import CapturePipeline, MemoryBackend, SharedCaptureBackend, SurfacePool
+
+
+def test_same_size_reuses_the_surface():
+    backend = MemoryBackend()
+    pool = SurfacePool(backend)
+    first = pool.acquire(15)
+    assert pool.acquire(15) is first
+    assert pool.acquire(15) is first
+    assert (pool.created, pool.reused, pool.released) == (1, 2, 0)
+    assert backend.live == 1
+
+
+def test_size_change_recreates_the_surface():
+    backend = MemoryBackend()
+    pool = SurfacePool(backend)
+    first = pool.acquire(15)
+    second = pool.acquire(31)
+    assert second is not first and second.sz == 31
+    assert not first.alive
+    assert (pool.created, pool.reused, pool.released) == (2, 0, 1)
+    assert backend.live == 1
+
+
+def test_invalidate_recreates_the_surface_once():
+    backend = MemoryBackend()
+    pool = SurfacePool(backend)
+    first = pool.acquire(15)
+    pool.invalidate()
+    second = pool.acquire(15)
+    assert second is not first
+    assert pool.acquire(15) is second
+    assert (pool.created, pool.reused, pool.released) == (2, 1, 1)
+    assert backend.live == 1
+
+
+def test_close_releases_everything():
+    backend = MemoryBackend()
+    pool = SurfacePool(backend)
+    surface = pool.acquire(15)
+    pool.acquire(21)
+    pool.close()
+    assert backend.live == 0
+    assert backend.closed
+    assert not surface.alive
+    assert pool.created == pool.released == 2
+
+
+def test_capture_and_present_round_trip():
+    backend = MemoryBackend(screen=lambda x, y, sz: bytes([x, y, sz, 255]) * (sz * sz))
+    pool = SurfacePool(backend)
+    surface = pool.acquire(3)
+    backend.capture(surface, 7, 9)
+    backend.present(surface, "hwnd", 7, 9, src=(1, 1, 1, 1))
+    assert backend.presented == [("hwnd", 7, 9, bytes([7, 9, 3, 255]))]
+    pool.close()
+    assert backend.live == 0
+
+
+def test_pipeline_keeps_pace_across_retargets():
+    pipeline = CapturePipeline(MemoryBackend(), 0.010)
+    pipeline.aim((15, 0, 0, None))
+    pipeline.scheduler.deadline = 5.0  # mid-run
+    pipeline.aim((15, 3, 4, None))     # e.g. following a moving position
+    assert pipeline.scheduler.deadline == 5.0
+    pipeline.aim(None)                 # paused: pacing restarts on resume
+    assert pipeline.scheduler.deadline is None
+
+
+def test_pipeline_captures_the_current_target():
+    backend = MemoryBackend(screen=lambda x, y, sz: bytes([x, y, sz, 255]) * (sz * sz))
+    pipeline = CapturePipeline(backend, 0.001)
+    pipeline.start()
+    try:
+        pipeline.aim((3, 1, 2, None))
+        frame = pipeline.take(timeout=2)
+        assert frame is not None and frame.target == (3, 1, 2, None)
+        assert bytes(frame.surface.view[:4]) == bytes([1, 2, 3, 255])
+        pipeline.release(frame)
+    finally:
+        pipeline.stop()
+    assert backend.live == 0
+
+
+def screen_pattern(x, y, n):
+    """Every pixel word encodes its own screen coordinates."""
+    return array("I", [(x + i % n) << 16 | (y + i // n) for i in range(n * n)]).tobytes()
+
+
+def test_shared_grab_allocates_only_the_union():
+    backend = MemoryBackend(screen_pattern, record=False)
+    shared = SharedCaptureBackend(backend)
+    shared.grab(100, 50, 400, 20)  # two overlays side by side
+    union = shared._union
+    assert (union.sz, union.height) == (400, 20)
+    assert len(union.view) == 400 * 20 * 4
+    shared.grab(120, 40, 300, 30)  # grows to fit, never shrinks
+    assert (shared._union.sz, shared._union.height) == (400, 30)
+
+    surface = shared.create(9)
+    shared.capture(surface, 130, 45, ((0, 0, 9, 9),))
+    direct = backend.create(9)
+    backend.capture(direct, 130, 45)
+    assert surface.words.tolist() == direct.words.tolist()
+    assert shared.misses == 0
+
+    shared.capture(surface, 500, 45, ((0, 0, 9, 9),))  # outside the grab
+    assert shared.misses == 1
+    assert surface.words[0] == 500 << 16 | 45
+    shared.destroy(surface)
+    backend.destroy(direct)
+    shared.close()
+    assert backend.live == 0
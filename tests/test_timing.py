@@ -0,0 +1,128 @@
+"""Frame pacing with a fake clock."""
+
+import pytest
+
+from crosshair_timing import AnimationClock, FrameScheduler, PositionFeed
+
+
+class FakeClock:
+    """Time that only moves when slept through or advanced by hand;
+    ``oversleep`` is added to every sleep, like a coarse OS timer."""
+
+    def __init__(self, oversleep=0.0):
+        self.now = 0.0
+        self.oversleep = oversleep
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds + self.oversleep
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_deadlines_absorb_paint_time():
+    clock = FakeClock()
+    scheduler = FrameScheduler(0.010, clock, clock.sleep)
+    wakes = []
+    for _ in range(100):
+        scheduler.wait()
+        wakes.append(clock.now)
+        clock.advance(0.004)  # painting
+    assert wakes[-1] == pytest.approx(1.0)
+    assert clock.sleeps[1:] == pytest.approx([0.006] * 99)
+    assert scheduler.dropped == 0
+
+
+def test_oversleep_does_not_accumulate():
+    clock = FakeClock(oversleep=0.0015)
+    scheduler = FrameScheduler(0.010, clock, clock.sleep)
+    for _ in range(100):
+        assert scheduler.wait() == pytest.approx(0.0015)
+    # Still phase-aligned: the last wake is one oversleep past deadline 100
+    assert clock.now == pytest.approx(1.0015)
+    assert scheduler.dropped == 0
+
+
+def test_late_frame_drops_missed_deadlines_instead_of_bursting():
+    clock = FakeClock()
+    scheduler = FrameScheduler(0.010, clock, clock.sleep)
+    scheduler.wait()
+    clock.advance(0.035)  # a long frame: deadlines at 20 and 30 ms are gone
+    assert scheduler.wait() == 0.0  # runs at once, standing for the 40 ms deadline
+    assert scheduler.dropped == 2
+    sleeps = len(clock.sleeps)
+    scheduler.wait()
+    assert len(clock.sleeps) == sleeps + 1  # back to sleeping, no catch-up burst
+    assert clock.now == pytest.approx(0.050)
+
+
+def test_reset_restarts_from_now():
+    clock = FakeClock()
+    scheduler = FrameScheduler(0.010, clock, clock.sleep)
+    scheduler.wait()
+    scheduler.reset()
+    clock.advance(1.0)
+    scheduler.wait()
+    assert clock.now == pytest.approx(1.020)
+    assert scheduler.dropped == 0
+
+
+def test_hold_animation_starts_from_rest_after_idling():
+    clock = FakeClock()
+    anim = AnimationClock(16, 32, "hold", clock)
+    assert anim.index(False) == 0 and anim.settled(False)
+    clock.advance(0.5)  # parked while resting on the first frame
+    assert anim.index(True) == 0
+    frames = []
+    for _ in range(20):
+        clock.advance(1 / 32)
+        frames.append(anim.index(True))
+    assert frames[:3] == [1, 2, 3]
+    assert frames[-1] == 15 and anim.settled(True)
+    clock.advance(5.0)
+    assert anim.index(False) == 15  # let go: runs back from the end, not from 5 s ago
+    clock.advance(1 / 32)
+    assert anim.index(False) == 14
+
+
+def test_looping_animations_follow_the_clock():
+    clock = FakeClock()
+    loop = AnimationClock(4, 10, "loop", clock)
+    pingpong = AnimationClock(4, 10, "pingpong", clock)
+    seen = []
+    for _ in range(8):
+        seen.append((loop.index(), pingpong.index()))
+        clock.advance(0.1)
+    assert [i for i, _ in seen] == [0, 1, 2, 3, 0, 1, 2, 3]
+    assert [j for _, j in seen] == [0, 1, 2, 3, 2, 1, 0, 1]
+    assert not loop.settled()
+
+
+def test_position_prediction_stops_with_the_source():
+    clock = FakeClock()
+    path = [(x, 500) for x in range(0, 64)]  # 1000 px/s at one sample per ms
+    feed = PositionFeed(path, predict=True, clock=clock)
+    shown = []
+    for _ in range(200):
+        shown.append(feed.poll(lead=0.010))
+        clock.advance(0.001)
+    assert shown[0] == (0, 500)
+    assert shown[30] == (40, 500)   # 10 ms ahead while moving
+    assert shown[63] == (73, 500)
+    assert set(shown[64:]) == {(63, 500)}  # source went quiet: no drift
+    assert feed.samples == 64
+
+
+def test_position_feed_without_prediction_follows_samples():
+    clock = FakeClock()
+    reads = iter([None, (10, 20), None, (12.6, 19.4)])
+    feed = PositionFeed(lambda: next(reads), clock=clock)
+    assert feed.poll() is None
+    assert feed.poll() == (10, 20)
+    assert feed.poll() == (10, 20)
+    assert feed.poll() == (13, 19)